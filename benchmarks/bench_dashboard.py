@@ -0,0 +1,89 @@
+"""
+Time and memory to open the dashboard over a large note collection, with rows
+fetched a page at a time against every row loaded up front.
+
+Notes are built in memory, as NoteManager holds them after loading, so only
+the dashboard itself is measured. Run from the repository root:
+
+    python benchmarks/bench_dashboard.py
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+import common  # First: sets up the path and database
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+
+import dashboard  # noqa: E402
+
+
+class Notes(QObject):
+    """The part of NoteManager the dashboard uses."""
+
+    note_changed = Signal(object)
+    note_added = Signal(object)
+    note_removed = Signal(object)
+    notes_added = Signal(list)
+
+    def __init__(self, count):
+        super().__init__()
+        self.notes = {
+            note.id: note for note in common.detached_notes(count, timer_every=5)
+        }
+
+
+def open_dashboard(notes, page_size, trace=False):
+    """Returns (milliseconds, peak traced MB, rows shown) for one opening."""
+    dashboard.PAGE_SIZE = page_size
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    window = dashboard.Dashboard(notes)
+    window.show()
+    QApplication.processEvents()
+    elapsed = (time.perf_counter() - start) * 1000
+    memory = 0.0
+    if trace:
+        memory = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    rows = window.model.rowCount()
+    window.hide()
+    window.deleteLater()
+    QApplication.processEvents()
+    return elapsed, memory, rows
+
+
+def measure(notes, page_size):
+    # Tracing slows Python down, so memory is measured in a separate opening
+    elapsed, _, rows = open_dashboard(notes, page_size)
+    _, memory, _ = open_dashboard(notes, page_size, trace=True)
+    return elapsed, memory, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    page_size = dashboard.PAGE_SIZE
+    print("open = construct, show and first paint; memory = Python peak")
+    print(f"{'notes':>8}{'paged ms':>11}{'paged MB':>11}{'rows':>7}"
+          f"{'all ms':>11}{'all MB':>11}")
+    for count in args.notes:
+        notes = Notes(count)
+        paged_ms, paged_mb, rows = measure(notes, page_size)
+        all_ms, all_mb, _ = measure(notes, count)
+        print(f"{count:8}{paged_ms:11.1f}{paged_mb:11.1f}{rows:7}"
+              f"{all_ms:11.1f}{all_mb:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
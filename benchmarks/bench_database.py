@@ -0,0 +1,116 @@
+"""
+Commit latency and dashboard query times on a large notes table: SQLite
+defaults without indexes against the engine and schema set up by database.py
+(WAL, synchronous=NORMAL, tuned cache, sort indexes).
+
+Run from the repository root:
+
+    python benchmarks/bench_database.py
+"""
+import argparse
+import os
+import statistics
+import time
+
+import common  # First: sets up the path and database
+
+from sqlalchemy import create_engine, event, text
+
+from database import Base, configure_connection, insert_notes
+from migrations import migrate
+
+PLAIN_SCHEMA = (
+    "CREATE TABLE notes (id INTEGER PRIMARY KEY, x INTEGER, y INTEGER, "
+    "text VARCHAR, priority VARCHAR, timer_enabled BOOLEAN, "
+    "timer_time BIGINT, stuck BOOLEAN)"
+)
+
+QUERIES = {
+    "timers by deadline": (
+        "SELECT id, timer_time FROM notes WHERE timer_enabled = 1 "
+        "ORDER BY timer_time LIMIT 100"
+    ),
+    "critical notes": (
+        "SELECT id FROM notes WHERE priority = 'Critical' ORDER BY id LIMIT 100"
+    ),
+    "count per priority": (
+        "SELECT priority, count(*) FROM notes GROUP BY priority"
+    ),
+}
+
+
+def plain_engine(rows):
+    """Returns the engine, filled with ``rows`` notes, and its edit statement."""
+    engine = create_engine(f"sqlite:///{os.path.join(common.BENCH_DIR, 'plain.db')}")
+    with engine.begin() as connection:
+        connection.execute(text(PLAIN_SCHEMA))
+        connection.execute(
+            text(
+                "INSERT INTO notes (x, y, text, priority, timer_enabled, "
+                "timer_time, stuck) VALUES (:x, :y, :text, :priority, "
+                ":timer_enabled, :timer_time, :stuck)"
+            ),
+            common.note_rows(rows, timer_every=10, stuck_every=100),
+        )
+    return engine, "UPDATE notes SET text = :text WHERE id = :id"
+
+
+def tuned_engine(rows):
+    engine = create_engine(f"sqlite:///{os.path.join(common.BENCH_DIR, 'tuned.db')}")
+    event.listen(engine, "connect", configure_connection)
+    migrate(engine, Base.metadata)
+    with engine.begin() as connection:
+        insert_notes(connection, common.note_rows(rows, timer_every=10, stuck_every=100))
+    return engine, "UPDATE note_bodies SET text = :text WHERE id = :id"
+
+
+def commit_latencies(engine, edit_sql, rows, commits):
+    latencies = []
+    for i in range(commits):
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            connection.execute(
+                text(edit_sql),
+                {"text": f"edited {i}", "id": (i * 7919) % rows + 1},
+            )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def query_time(engine, sql, repeat):
+    with engine.connect() as connection:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            connection.execute(text(sql)).fetchall()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    for name, factory in (("defaults", plain_engine), ("tuned", tuned_engine)):
+        engine, edit_sql = factory(args.rows)
+        latencies = commit_latencies(engine, edit_sql, args.rows, args.commits)
+        results[name] = {
+            "commit p50": statistics.median(latencies),
+            "commit p99": statistics.quantiles(latencies, n=100)[98],
+        }
+        for label, sql in QUERIES.items():
+            results[name][label] = query_time(engine, sql, args.repeat)
+        engine.dispose()
+
+    print(f"{args.rows} notes, {args.commits} single-row commits, "
+          f"queries averaged over {args.repeat} runs (ms)")
+    print(f"{'':22}{'defaults':>10}{'tuned':>10}")
+    for label in results["defaults"]:
+        print(f"{label:22}{results['defaults'][label]:10.3f}"
+              f"{results['tuned'][label]:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
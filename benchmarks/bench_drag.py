@@ -0,0 +1,136 @@
+"""
+Replays synthetic mouse streams on note windows and counts window moves,
+saves and commits, for the previous drag handling (a move per event and a
+save on every release) and NoteWindow's frame-throttled dragging.
+
+Events are sent in real time at the given rate, so the frame timer runs as
+it would on screen. Run from the repository root:
+
+    python benchmarks/bench_drag.py
+"""
+import argparse
+import math
+import sys
+import time
+
+import common  # noqa: F401  (first: sets up the path and database)
+
+from PySide6.QtCore import QEvent, QPoint, QPointF, Qt
+from PySide6.QtGui import QMouseEvent
+from PySide6.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+
+from database import init_db  # noqa: E402
+from note_window import NoteWindow  # noqa: E402
+from persistence import write_behind  # noqa: E402
+
+
+class CountingWindow(NoteWindow):
+    def __init__(self):
+        self.moves = 0
+        super().__init__(active_notewindows={})
+
+    def move(self, *args):
+        self.moves += 1
+        super().move(*args)
+
+
+class LegacyWindow(CountingWindow):
+    """The drag handling NoteWindow had before frame throttling."""
+
+    def mousePressEvent(self, e):
+        self.previous_pos = e.globalPosition()
+
+    def mouseMoveEvent(self, e):
+        delta = e.globalPosition() - self.previous_pos
+        self.move(self.x() + delta.x(), self.y() + delta.y())
+        self.previous_pos = e.globalPosition()
+
+    def mouseReleaseEvent(self, e):
+        self.save()
+
+
+def click(steps):
+    return []
+
+
+def line(steps):
+    return [QPointF(300 * i / steps, 120 * i / steps) for i in range(1, steps + 1)]
+
+
+def jitter(steps):
+    # Hand tremor around the press point, released where it started
+    return [
+        QPointF(round(3 * math.sin(i / 3)), round(2 * math.cos(i / 5)) - 2)
+        for i in range(1, steps)
+    ] + [QPointF(0, 0)]
+
+
+def send(window, event_type, offset, origin):
+    button = Qt.MouseButton.LeftButton
+    buttons = Qt.MouseButton.NoButton if event_type == QEvent.Type.MouseButtonRelease else button
+    global_position = origin + offset
+    event = QMouseEvent(
+        event_type, QPointF(10, 10) + offset, global_position,
+        button, buttons, Qt.KeyboardModifier.NoModifier,
+    )
+    QApplication.sendEvent(window, event)
+
+
+def replay(window, offsets, rate):
+    """Sends press, moves at ``rate`` Hz and release; returns counters."""
+    write_behind.flush()
+    saves, commits = write_behind.saves_requested, write_behind.commits
+    window.moves = 0
+    start_position = window.pos()
+    origin = QPointF(window.pos()) + QPointF(10, 10)
+    send(window, QEvent.Type.MouseButtonPress, QPointF(0, 0), origin)
+    start = time.perf_counter()
+    for i, offset in enumerate(offsets):
+        # Pace the stream, letting timers run in between
+        while time.perf_counter() - start < i / rate:
+            QApplication.processEvents()
+        send(window, QEvent.Type.MouseMove, offset, origin)
+    QApplication.processEvents()
+    last = offsets[-1] if offsets else QPointF(0, 0)
+    send(window, QEvent.Type.MouseButtonRelease, last, origin)
+    write_behind.flush()
+    expected = start_position + last.toPoint()
+    return {
+        "events": len(offsets),
+        "moves": window.moves,
+        "saves": write_behind.saves_requested - saves,
+        "commits": write_behind.commits - commits,
+        "on target": window.pos() == expected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=int, default=1000, help="mouse events per second")
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+    init_db()
+
+    steps = max(1, int(args.rate * args.seconds))
+    windows = {"legacy": LegacyWindow(), "throttled": CountingWindow()}
+    for window in windows.values():
+        window.move(QPoint(200, 200))
+        window.show()
+        window.save()
+    QApplication.processEvents()
+
+    print(f"{args.rate} Hz mouse, {args.seconds}s streams")
+    print(f"{'stream':10}{'handler':11}{'events':>8}{'moves':>7}{'saves':>7}"
+          f"{'commits':>9}{'on target':>11}")
+    for name, stream in [("click", click), ("drag", line), ("jitter", jitter)]:
+        for label, window in windows.items():
+            result = replay(window, stream(steps), args.rate)
+            print(f"{name:10}{label:11}{result['events']:8}{result['moves']:7}"
+                  f"{result['saves']:7}{result['commits']:9}"
+                  f"{str(result['on target']):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Note history storage and speed: bytes kept by note_versions against a full
+copy of the text per save, time to record a save, to rebuild a version and
+to prune a month of history.
+
+Typing is simulated as saves a second apart in sessions of a few minutes,
+one session a day. Run from the repository root:
+
+    python benchmarks/bench_history.py
+"""
+import argparse
+import random
+import statistics
+import time
+
+import common  # First: sets up the path and database
+
+from sqlalchemy import text
+
+import history
+from database import engine, init_db, insert_notes
+
+WORDS = "buy call send fix review write plan check book pay read the a".split()
+
+
+def edit(note_text, rng):
+    """Types a few characters, mostly at the end, sometimes mid-text."""
+    typed = " ".join(rng.choices(WORDS, k=rng.randint(1, 3)))
+    if rng.random() < 0.1:
+        typed += "\n"
+    if rng.random() < 0.8 or not note_text:
+        return note_text + typed
+    position = rng.randrange(len(note_text))
+    return note_text[:position] + typed + note_text[position:]
+
+
+def simulate(connection, notes, days, saves, seed=1):
+    """
+    Returns (saves recorded, bytes if every save kept a copy, median record
+    ms, final texts by note id).
+    """
+    rng = random.Random(seed)
+    ids = insert_notes(
+        connection, common.note_rows(notes, text=lambda i, rng: "")
+    )
+    texts = dict.fromkeys(ids, "")
+    start = int(time.time()) - days * history.DAY
+    recorded = 0
+    naive_bytes = 0
+    timings = []
+    for day in range(days):
+        for note_id in ids:
+            now = start + day * history.DAY + rng.randrange(3600)
+            for _ in range(saves):
+                now += rng.randint(1, 3)
+                texts[note_id] = edit(texts[note_id], rng)
+                begin = time.perf_counter()
+                history.history.record(connection, note_id, texts[note_id], now=now)
+                timings.append((time.perf_counter() - begin) * 1000)
+                recorded += 1
+                naive_bytes += len(texts[note_id].encode("utf-8"))
+    return recorded, naive_bytes, statistics.median(timings), texts
+
+
+def stored(connection):
+    return connection.execute(
+        text(
+            "SELECT count(*), coalesce(sum(length(CAST(data AS BLOB))), 0) "
+            "FROM note_versions"
+        )
+    ).one()
+
+
+def rebuild_ms(connection, repeat, seed=2):
+    rng = random.Random(seed)
+    rows = connection.execute(
+        text("SELECT note_id, version FROM note_versions")
+    ).all()
+    timings = []
+    for note_id, version in rng.choices(rows, k=repeat):
+        history.history.texts.clear()
+        begin = time.perf_counter()
+        history.history.text_at(connection, note_id, version)
+        timings.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--saves", type=int, default=60,
+                        help="saves per note per day")
+    parser.add_argument("--snapshot-every", type=int, default=history.SNAPSHOT_EVERY)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    history.SNAPSHOT_EVERY = args.snapshot_every
+    init_db()
+
+    with engine.begin() as connection:
+        recorded, naive_bytes, record_ms, texts = simulate(
+            connection, args.notes, args.days, args.saves
+        )
+        final_bytes = sum(len(note_text.encode("utf-8")) for note_text in texts.values())
+        versions, kept_bytes = stored(connection)
+        p50, worst = rebuild_ms(connection, args.repeat)
+        print(f"{args.notes} notes x {args.days} days x {args.saves} saves = "
+              f"{recorded} saves, {final_bytes / 1e3:.0f} KB of current text")
+        print(f"full copy per save      {naive_bytes / 1e6:10.2f} MB")
+        print(f"note_versions           {kept_bytes / 1e6:10.2f} MB in {versions} versions "
+              f"(snapshot every {history.SNAPSHOT_EVERY})")
+        print(f"record a save           {record_ms:10.3f} ms median")
+        print(f"rebuild a version       {p50:10.3f} ms median, {worst:.3f} ms max")
+
+        begin = time.perf_counter()
+        removed = history.history.prune(connection)
+        prune_s = time.perf_counter() - begin
+        versions, kept_bytes = stored(connection)
+        print(f"prune                   {prune_s:10.2f} s, {removed} removed, "
+              f"{versions} versions in {kept_bytes / 1e6:.2f} MB left")
+
+
+if __name__ == "__main__":
+    main()
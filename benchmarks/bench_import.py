@@ -0,0 +1,108 @@
+"""
+Bulk import throughput: a commit per note, as creating notes one at a time
+does, against batched inserts with per-row triggers and import_notes(),
+which does the trigger work once per import.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+import common  # First: sets up the path and database
+
+from sqlalchemy import text
+
+from database import Note, engine, init_db, insert_notes, session
+from importer import import_files, note_row
+
+
+def make_notes(count):
+    """Import source rows: text, priority and an optional deadline."""
+    return [
+        {
+            "text": row["text"],
+            "priority": row["priority"],
+            "timer_time": row["timer_time"] or "",
+        }
+        for row in common.note_rows(count, timer_every=5)
+    ]
+
+
+def write_files(notes, directory):
+    """Writes ``notes`` as one CSV file, one JSON file and a Markdown file."""
+    paths = {}
+    paths["csv"] = os.path.join(directory, "notes.csv")
+    with open(paths["csv"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, ["text", "priority", "timer_time"])
+        writer.writeheader()
+        writer.writerows(notes)
+    paths["json"] = os.path.join(directory, "notes.json")
+    with open(paths["json"], "w", encoding="utf-8") as f:
+        json.dump(notes, f)
+    paths["markdown"] = os.path.join(directory, "notes.md")
+    with open(paths["markdown"], "w", encoding="utf-8") as f:
+        for i, note in enumerate(notes):
+            f.write(f"# Note {i}\n{note['text']}\n\n")
+    return paths
+
+
+def count_notes():
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT count(*) FROM notes")).scalar()
+
+
+def commit_per_note(notes):
+    for values in notes:
+        row = note_row(values)
+        note_text = row.pop("text")
+        note = Note(**row)
+        note.text = note_text
+        session.add(note)
+        session.commit()
+
+
+def batched_with_triggers(notes, batch_size=5000):
+    rows = [note_row(values) for values in notes]
+    with engine.begin() as connection:
+        for start in range(0, len(rows), batch_size):
+            insert_notes(connection, rows[start:start + batch_size])
+
+
+def timed(function, *args):
+    before = count_notes()
+    start = time.perf_counter()
+    function(*args)
+    seconds = time.perf_counter() - start
+    return count_notes() - before, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--commit-notes", type=int, default=1000,
+                        help="notes for the commit per note baseline")
+    args = parser.parse_args()
+    init_db()
+
+    notes = make_notes(args.notes)
+    paths = write_files(notes, common.BENCH_DIR)
+    print(f"{args.notes} notes ({args.commit_notes} for a commit per note)")
+    print(f"{'':34}{'notes':>8}{'seconds':>10}{'notes/s':>10}")
+    for label, function, function_args in [
+        ("commit per note", commit_per_note, [notes[:args.commit_notes]]),
+        ("batched, per-row triggers", batched_with_triggers, [notes]),
+        ("import_files(csv)", import_files, [[paths["csv"]]]),
+        ("import_files(json)", import_files, [[paths["json"]]]),
+        ("import_files(markdown sections)", import_files, [[paths["markdown"]], True]),
+    ]:
+        count, seconds = timed(function, *function_args)
+        print(f"{label:34}{count:8}{seconds:10.2f}{count / seconds:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
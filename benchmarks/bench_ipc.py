@@ -0,0 +1,93 @@
+"""
+Latency of commands forwarded to a running instance: in-process round trips,
+cli.py invocations and a second launch of main.py, against the cold start of
+the instance that owns the database.
+
+Starts main.py on a scratch database and socket name. Run from the
+repository root:
+
+    python benchmarks/bench_ipc.py
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import ROOT  # First: sets up the path and database
+
+os.environ["NOTES_IPC_NAME"] = f"warkah-semat-bench-{os.getpid()}"
+
+from ipc import send_command, server_address  # noqa: E402
+
+
+def wait_for_instance(process, timeout=30):
+    """Returns the seconds until the instance answers commands."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            sys.exit(f"main.py exited with status {process.returncode}")
+        try:
+            send_command("list")
+        except OSError:
+            time.sleep(0.01)
+            continue
+        return time.perf_counter() - start
+    sys.exit("main.py did not start listening")
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(*args):
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    instance = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        cold_start = wait_for_instance(instance)
+        for i in range(args.notes):
+            send_command("add", f"1. Note {i}\n2. Item {i}")
+        note_id = send_command("list")[-1]["id"]
+
+        print(f"{args.notes} notes, median of {args.repeat} (ms)")
+        for label, function in [
+            ("first instance ready", None),
+            ("send_command('show')", lambda: send_command("show", note_id)),
+            ("send_command('list')", lambda: send_command("list")),
+            ("cli.py show", lambda: run("cli.py", "show", str(note_id))),
+            ("cli.py list", lambda: run("cli.py", "list")),
+            ("second main.py launch", lambda: run("main.py")),
+        ]:
+            if function is None:
+                ms = cold_start * 1000
+            else:
+                ms = median_ms(function, args.repeat)
+            print(f"{label:26}{ms:10.1f}")
+    finally:
+        instance.terminate()
+        instance.wait()
+        # Terminated instances leave their socket behind
+        if os.name != "nt" and os.path.exists(server_address()):
+            os.remove(server_address())
+
+
+if __name__ == "__main__":
+    main()
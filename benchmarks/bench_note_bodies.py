@@ -0,0 +1,90 @@
+"""
+Memory and time to load the notes and open the dashboard when notes have
+large bodies: the previews NoteManager loads against every body loaded too.
+
+Run from the repository root:
+
+    python benchmarks/bench_note_bodies.py
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+import common  # First: sets up the path and database
+
+from PySide6.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from dashboard import Dashboard  # noqa: E402
+from database import Note, init_db, session  # noqa: E402
+from note_manager import NoteManager  # noqa: E402
+
+WORDS = "log line error warning request response retry timeout cache".split()
+
+
+def body_text(body_kb):
+    lines = body_kb * 1024 // 48
+    return lambda i, rng: "\n".join(
+        f"{n:05} " + " ".join(rng.choices(WORDS, k=6)) for n in range(lines)
+    )
+
+
+def measure(load):
+    """Returns (seconds, MB still allocated, peak MB) for ``load()``."""
+    session.expunge_all()  # Start from an empty identity map like main.py
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+
+    # Tracing slows Python down, so memory is measured in a second run
+    session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    kept = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed, current / 1e6, peak / 1e6
+
+
+def open_dashboard():
+    note_manager = NoteManager()
+    note_manager.load()
+    dashboard = Dashboard(note_manager)
+    dashboard.show()
+    QApplication.processEvents()
+    dashboard.hide()
+    return note_manager, dashboard
+
+
+def load_bodies():
+    return session.query(Note).options(selectinload(Note.body)).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=10000)
+    parser.add_argument("--body-kb", type=int, default=100)
+    args = parser.parse_args()
+    init_db()
+
+    start = time.perf_counter()
+    common.fill(common.note_rows(args.notes, text=body_text(args.body_kb)), 500)
+    print(f"{args.notes} notes of {args.body_kb} KB written in "
+          f"{time.perf_counter() - start:.1f}s")
+    print(f"{'':26}{'seconds':>10}{'kept MB':>10}{'peak MB':>10}")
+    for label, load in [
+        ("dashboard (previews)", open_dashboard),
+        ("all notes with bodies", load_bodies),
+    ]:
+        elapsed, current, peak = measure(load)
+        print(f"{label:26}{elapsed:10.2f}{current:10.1f}{peak:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+NoteWindow painting with hundreds of windows on screen: the cached background
+pixmap against building and filling an antialiased rounded path on every
+paint, for full repaints and for one countdown tick of every window.
+
+Run from the repository root:
+
+    python benchmarks/bench_paint.py
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import common  # First: sets up the path and database
+
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QBrush, QColor, QPainter, QPainterPath
+from PySide6.QtWidgets import QApplication, QWidget
+
+app = QApplication(sys.argv)
+
+from database import Note, init_db  # noqa: E402
+from note_window import NoteWindow  # noqa: E402
+from scheduler import scheduler  # noqa: E402
+
+
+class MeasuredWindow(NoteWindow):
+    """Counts paint events, the pixels they cover and the time they take."""
+
+    def __init__(self, note):
+        self.paints = 0
+        self.pixels = 0
+        self.paint_seconds = 0.0
+        super().__init__(note=note, active_notewindows={})
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.paint_seconds += time.perf_counter() - start
+        self.paints += 1
+        self.pixels += event.rect().width() * event.rect().height()
+
+
+class LegacyWindow(MeasuredWindow):
+    """Painting as NoteWindow did before the background cache."""
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        QWidget.paintEvent(self, event)
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        path = QPainterPath()
+        rect = QRectF(0, 0, self.width(), self.height())
+        path.addRoundedRect(rect, 20, 20)
+        if self.note.priority == "Critical":
+            bg_color = "#C5172E"
+        elif self.note.priority == "High":
+            bg_color = "#85193C"
+        elif self.note.priority == "Medium":
+            bg_color = "#E85C0D"
+        else:
+            bg_color = "#FCF259"
+        painter.fillPath(path, QBrush(QColor(bg_color)))
+        painter.end()
+        self.paint_seconds += time.perf_counter() - start
+        self.paints += 1
+        self.pixels += event.rect().width() * event.rect().height()
+
+    def update_countdown(self):
+        super().update_countdown()
+        if self.note.timer_enabled and self.note.timer_time:
+            self.update()  # The whole window, every second
+
+
+def make_windows(window_class, count):
+    windows = []
+    rows = common.note_rows(
+        count, timer_every=1, timer_range=(3600, 86400), stuck_every=1
+    )
+    for row in rows:
+        window = window_class(Note(**row))
+        scheduler.unwatch(window.update_countdown)  # Ticks are sent by hand
+        windows.append(window)
+    QApplication.processEvents()
+    return windows
+
+
+def reset(windows):
+    for window in windows:
+        window.paints = 0
+        window.pixels = 0
+        window.paint_seconds = 0.0
+
+
+def totals(windows, elapsed):
+    return {
+        "ms": elapsed * 1000,
+        "paint ms": sum(window.paint_seconds for window in windows) * 1000,
+        "paints": sum(window.paints for window in windows),
+        "Mpixels": sum(window.pixels for window in windows) / 1e6,
+    }
+
+
+def full_repaint(windows):
+    reset(windows)
+    start = time.perf_counter()
+    for window in windows:
+        window.repaint()
+    return totals(windows, time.perf_counter() - start)
+
+
+def countdown_tick(windows):
+    reset(windows)
+    start = time.perf_counter()
+    for window in windows:
+        # A second passes, so every countdown shows a new text
+        window.note.timer_time -= 1
+        window.update_countdown()
+    QApplication.processEvents()
+    return totals(windows, time.perf_counter() - start)
+
+
+def median_run(function, windows, repeat):
+    runs = [function(windows) for _ in range(repeat)]
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--windows", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    init_db()
+
+    print(f"{args.windows} windows, median of {args.repeat}; paint ms is the "
+          "time inside paintEvent")
+    print(f"{'':26}{'ms':>9}{'paint ms':>10}{'paints':>8}{'Mpixels':>9}")
+    for label, window_class in [("legacy", LegacyWindow), ("cached", MeasuredWindow)]:
+        windows = make_windows(window_class, args.windows)
+        for name, function in [("full repaint", full_repaint),
+                               ("countdown tick", countdown_tick)]:
+            result = median_run(function, windows, args.repeat)
+            print(f"{label + ' ' + name:26}{result['ms']:9.1f}"
+                  f"{result['paint ms']:10.1f}{result['paints']:8.0f}"
+                  f"{result['Mpixels']:9.2f}")
+        for window in windows:
+            window.close()
+            window.deleteLater()
+        QApplication.processEvents()
+
+
+if __name__ == "__main__":
+    main()
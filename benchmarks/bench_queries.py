@@ -0,0 +1,92 @@
+"""
+Listing every note for read-only use: session.query(Note).all() against
+column-only selects returning rows and NoteRecords.
+
+Run from the repository root:
+
+    python benchmarks/bench_queries.py
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+
+import common  # First: sets up the path and database
+
+from sqlalchemy import insert, select
+
+from database import (
+    Note,
+    NoteRecord,
+    engine,
+    init_db,
+    note_records,
+    session,
+)
+
+
+def fill(rows):
+    # Only the notes table is read, so the bodies are left out
+    notes = common.note_rows(
+        rows, timer_every=5,
+        text=lambda i, rng: f"1. Note {i} " + "x" * rng.randrange(80),
+    )
+    for note in notes:
+        note["preview"] = note.pop("text")
+    with engine.begin() as connection:
+        connection.execute(insert(Note), notes)
+
+
+def orm_instances():
+    return session.query(Note).all()
+
+
+def orm_columns():
+    columns = [getattr(Note, name) for name in NoteRecord._fields]
+    return session.execute(select(*columns).order_by(Note.id)).all()
+
+
+def run(load, repeat):
+    """Returns (median seconds, MB kept by the result) over ``repeat`` loads."""
+    timings = []
+    for _ in range(repeat):
+        session.expunge_all()
+        gc.collect()
+        start = time.perf_counter()
+        result = load()
+        timings.append(time.perf_counter() - start)
+        del result
+    session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    kept = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del result
+    session.expunge_all()
+    return statistics.median(timings), kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    init_db()
+    fill(args.rows)
+
+    print(f"{args.rows} notes, median of {args.repeat} loads")
+    print(f"{'':34}{'ms':>9}{'rows/s':>12}{'MB':>8}")
+    for label, load in [
+        ("session.query(Note).all()", orm_instances),
+        ("select(Note columns) rows", orm_columns),
+        ("note_records()", note_records),
+    ]:
+        seconds, kept = run(load, args.repeat)
+        print(f"{label:34}{seconds * 1000:9.1f}{args.rows / seconds:12.0f}"
+              f"{kept:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Full-text search latency on a large, synthetic notes table indexed by the
+notes_fts FTS5 table: database.search_notes(), which ranks and makes
+snippets, and search_matches(), which finds every match for the dashboard.
+
+Run from the repository root:
+
+    python benchmarks/bench_search.py
+"""
+import argparse
+import statistics
+import time
+
+import common  # First: sets up the path and database
+
+from database import init_db, search_matches, search_notes
+
+WORDS = (
+    "buat aplikasi kasir coffee banner produk chatbot frontend backend "
+    "golang next meeting review deploy server invoice laporan ujian guru "
+    "kantin library dorm release budget design sprint bug fix cursor list "
+    "timer deadline priority sync sheets export import search index"
+).split()
+
+QUERIES = ["coffee", "app", "deploy server", "kas", "bug fix cursor", "d", "zzz"]
+
+
+def vocabulary(size):
+    # The words above are the most frequent, followed by filler words, with
+    # Zipf-distributed frequencies like natural text.
+    words = WORDS + [f"kata{i}" for i in range(max(0, size - len(WORDS)))]
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    return words, weights
+
+
+def note_text(words_per_note, vocabulary_size):
+    words, weights = vocabulary(vocabulary_size)
+    return lambda i, rng: f"{i}. " + " ".join(
+        rng.choices(words, weights, k=words_per_note)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=30)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    init_db()
+
+    start = time.perf_counter()
+    common.fill(common.note_rows(
+        args.rows, text=note_text(args.words, args.vocabulary)
+    ), 10000)
+    print(f"{args.rows} notes indexed in {time.perf_counter() - start:.1f}s, "
+          f"limit {args.limit}")
+
+    print(f"{'':18}{'ranked':>7}{'p50 ms':>9}{'max ms':>9}"
+          f"{'matches':>9}{'p50 ms':>9}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = search_notes(query, limit=args.limit)
+            timings.append((time.perf_counter() - start) * 1000)
+        match_timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            matches = search_matches(query)
+            match_timings.append((time.perf_counter() - start) * 1000)
+        print(f"{query!r:18}{len(results):7}"
+              f"{statistics.median(timings):9.2f}{max(timings):9.2f}"
+              f"{len(matches):9}{statistics.median(match_timings):9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Dashboard ordering with many notes: a QSortFilterProxyModel calling a Python
+lessThan (the previous design) against NoteTableModel's maintained sort
+indexes, for a full sort and for re-sorting after a single note changes.
+
+Run from the repository root:
+
+    python benchmarks/bench_sort.py
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import common  # First: sets up the path and database
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QDateTime,
+    QModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+)
+from PySide6.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+
+from dashboard import NoteTableModel, SORT_KEYS  # noqa: E402
+
+SORT_KEY_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class LegacyModel(QAbstractTableModel):
+    def __init__(self, notes):
+        super().__init__()
+        self.notes = list(notes)
+        self.row_by_id = {note.id: row for row, note in enumerate(self.notes)}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.notes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 6
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        return None
+
+    def note_at(self, row):
+        return self.notes[row]
+
+    def note_changed(self, note):
+        row = self.row_by_id[note.id]
+        self.dataChanged.emit(self.index(row, 0), self.index(row, 5))
+
+
+class LegacyProxy(QSortFilterProxyModel):
+    def __init__(self, criteria):
+        super().__init__()
+        self.criteria = criteria
+        self.setSortRole(SORT_KEY_ROLE)
+        self.setDynamicSortFilter(True)
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        return self.get_sorting_key(
+            model.note_at(left.row())
+        ) < self.get_sorting_key(model.note_at(right.row()))
+
+    def get_sorting_key(self, note):
+        if self.criteria == "Priority":
+            priority_values = {"Critical": 1, "High": 2, "Medium": 3, "Low": 4}
+            return priority_values.get(note.priority, 5)
+        elif self.criteria == "Time Remaining":
+            if note.timer_enabled and note.timer_time is not None:
+                remaining = QDateTime.fromSecsSinceEpoch(
+                    note.timer_time
+                ).toMSecsSinceEpoch() - QDateTime.currentDateTime().toMSecsSinceEpoch()
+                return remaining if remaining >= 0 else float("inf")
+            return float("inf")
+        return note.text or ""
+
+
+def edit(note, rng):
+    note.priority = rng.choice(common.PRIORITIES)
+    note.text = f"note {rng.randrange(1000000)}"
+    if note.timer_enabled:
+        note.timer_time += rng.randint(-3600, 3600)
+
+
+def time_edits(notes, model, edits, seed=2):
+    rng = random.Random(seed)
+    timings = []
+    for _ in range(edits):
+        note = rng.choice(notes)
+        edit(note, rng)
+        start = time.perf_counter()
+        model.note_changed(note)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=10000)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.notes} notes, single-note edits: median of {args.edits} (ms)")
+    print(f"{'criteria':16}{'legacy sort':>13}{'legacy edit':>13}"
+          f"{'index sort':>13}{'index edit':>13}")
+    for criteria in ["Priority", "Time Remaining", "Text"]:
+        notes = common.detached_notes(args.notes, timer_every=3)
+        legacy = LegacyModel(notes)
+        proxy = LegacyProxy(criteria)
+        start = time.perf_counter()
+        proxy.setSourceModel(legacy)
+        proxy.sort(0)
+        legacy_sort = (time.perf_counter() - start) * 1000
+        legacy_edit = time_edits(notes, legacy, args.edits)
+
+        notes = common.detached_notes(args.notes, timer_every=3)
+        model = NoteTableModel(notes)
+        start = time.perf_counter()
+        model.set_criteria(criteria)
+        index_sort = (time.perf_counter() - start) * 1000
+        index_edit = time_edits(notes, model, args.edits)
+        assert [model.order.id_at(row) for row in range(len(notes))] == [
+            note.id for note in sorted(
+                notes, key=lambda note: (SORT_KEYS[criteria](note), note.id)
+            )
+        ]
+        print(f"{criteria:16}{legacy_sort:13.2f}{legacy_edit:13.3f}"
+              f"{index_sort:13.2f}{index_edit:13.3f}")
+
+
+if __name__ == "__main__":
+    main()
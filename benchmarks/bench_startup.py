@@ -0,0 +1,52 @@
+"""
+Time from loading the stored notes to a visible tray icon.
+
+Mirrors the startup path of main.py against a temporary database filled with
+synthetic notes, of which only a few are stuck on screen. Run from the
+repository root:
+
+    python benchmarks/bench_startup.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import common  # First: sets up the path and database
+
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon
+
+app = QApplication(sys.argv)
+
+from database import init_db  # noqa: E402
+from note_manager import NoteManager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--stuck-every", type=int, default=100,
+                        help="every Nth note is stuck on screen")
+    args = parser.parse_args()
+    init_db()
+
+    common.fill(common.note_rows(args.notes, stuck_every=args.stuck_every))
+
+    start = time.perf_counter()
+    note_manager = NoteManager()
+    note_manager.load()
+    loaded = time.perf_counter()
+    tray = QSystemTrayIcon()
+    tray.setIcon(QIcon(os.path.join('resources', 'sticky-note.png')))
+    tray.setVisible(True)
+    end = time.perf_counter()
+
+    print(f"{len(note_manager.notes)} notes, "
+          f"{len(note_manager.windows)} windows materialized")
+    print(f"load notes:      {(loaded - start) * 1000:8.1f} ms")
+    print(f"time to tray:    {(end - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
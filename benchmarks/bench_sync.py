@@ -0,0 +1,129 @@
+"""
+Google Sheets sync end to end against a local HTTP stand-in for the Apps
+Script endpoint: a first full sync, then delta syncs after a few edits and
+deletes, checking that the CSV received round-trips the notes table.
+
+Run from the repository root:
+
+    python benchmarks/bench_sync.py
+"""
+import argparse
+import csv
+import io
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import common  # First: sets up the path and database
+
+from sqlalchemy import delete, select, update
+
+from database import Note, NoteBody, engine, init_db
+from sync import sync_to_google_sheets
+
+# Text that a naive ",".join() would corrupt
+AWKWARD_TEXT = '1. milk, eggs\n2. the "good" coffee\n- done; really'
+
+
+class SheetStandIn(BaseHTTPRequestHandler):
+    """Applies each posted CSV chunk to an in-memory sheet, keyed by ID."""
+
+    sheet = {}
+    requests = 0
+    received_bytes = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        cls = type(self)
+        cls.requests += 1
+        cls.received_bytes += len(body)
+        for row in csv.DictReader(io.StringIO(body.decode("utf-8"))):
+            if row["Op"] == "delete":
+                cls.sheet.pop(row["ID"], None)
+            else:
+                cls.sheet[row["ID"]] = row
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SheetStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/exec"
+
+
+def fill(rows):
+    common.fill(common.note_rows(
+        rows, stuck_every=1,
+        text=lambda i, rng: AWKWARD_TEXT if i % 50 == 0 else f"1. Note {i}",
+    ))
+
+
+def edit(changes, deletes, seed=2):
+    rng = random.Random(seed)
+    with engine.begin() as connection:
+        ids = connection.execute(select(Note.id)).scalars().all()
+        for note_id in rng.sample(ids, changes):
+            connection.execute(
+                update(NoteBody).where(NoteBody.id == note_id).values(
+                    text=f"{AWKWARD_TEXT}\n{note_id}"
+                )
+            )
+            connection.execute(
+                update(Note).where(Note.id == note_id).values(priority="High")
+            )
+        for note_id in rng.sample(ids, deletes):
+            connection.execute(delete(Note).where(Note.id == note_id))
+
+
+def check_sheet():
+    with engine.connect() as connection:
+        notes = {
+            str(note_id): (note_text, priority)
+            for note_id, note_text, priority in connection.execute(
+                select(Note.id, NoteBody.text, Note.priority).join(NoteBody)
+            )
+        }
+    sheet = {
+        note_id: (row["Text"], row["Priority"])
+        for note_id, row in SheetStandIn.sheet.items()
+    }
+    assert sheet == notes, "sheet does not match the notes table"
+
+
+def timed_sync(url, label):
+    SheetStandIn.requests = SheetStandIn.received_bytes = 0
+    start = time.perf_counter()
+    rows = sync_to_google_sheets(url)
+    elapsed = (time.perf_counter() - start) * 1000
+    check_sheet()
+    print(f"{label:28}{rows:8} rows {SheetStandIn.requests:5} requests "
+          f"{SheetStandIn.received_bytes / 1024:9.1f} KiB {elapsed:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--changes", type=int, default=50)
+    parser.add_argument("--deletes", type=int, default=10)
+    args = parser.parse_args()
+    init_db()
+
+    server, url = start_server()
+    fill(args.rows)
+    print(f"{args.rows} notes, then {args.changes} edits and "
+          f"{args.deletes} deletes; the sheet is checked after every sync")
+    timed_sync(url, "first sync (everything)")
+    edit(args.changes, args.deletes)
+    timed_sync(url, "delta sync")
+    timed_sync(url, "nothing changed")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
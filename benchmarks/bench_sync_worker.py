@@ -0,0 +1,145 @@
+"""
+How long the Qt event loop stalls while notes sync to a slow, flaky local
+stand-in for the Apps Script endpoint: syncing in the tray slot against the
+background SyncWorker with its outbox and exponential backoff.
+
+Run from the repository root:
+
+    python benchmarks/bench_sync_worker.py
+"""
+import argparse
+import csv
+import io
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import common  # First: sets up the path and database
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+from sqlalchemy import select, update
+
+from database import NoteBody, engine, init_db
+from sync import SyncWorker, pending_rows, sync_to_google_sheets
+
+app = QCoreApplication(sys.argv)
+
+
+class FlakyStandIn(BaseHTTPRequestHandler):
+    """Answers after ``latency`` seconds and fails every ``fail_every``th POST."""
+
+    latency = 0.2
+    fail_every = 3
+    sheet = {}
+    requests = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        cls = type(self)
+        cls.requests += 1
+        time.sleep(cls.latency)
+        if cls.requests % cls.fail_every == 0:
+            self.send_response(503)
+            self.end_headers()
+            return
+        for row in csv.DictReader(io.StringIO(body.decode("utf-8"))):
+            if row["Op"] == "delete":
+                cls.sheet.pop(row["ID"], None)
+            else:
+                cls.sheet[row["ID"]] = row["Text"]
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def touch_all(label):
+    with engine.begin() as connection:
+        connection.execute(
+            update(NoteBody).values(text=NoteBody.text + f" {label}")
+        )
+
+
+def check_sheet():
+    with engine.connect() as connection:
+        rows = connection.execute(select(NoteBody.id, NoteBody.text))
+        notes = {str(i): t for i, t in rows}
+    assert FlakyStandIn.sheet == notes, "sheet does not match the notes table"
+
+
+def measure_stalls(start_sync, done, timeout):
+    """Runs the event loop with a 5 ms timer; returns the longest gap in ms."""
+    loop = QEventLoop()
+    ticks = [time.perf_counter()]
+    gaps = []
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - ticks[-1])
+        ticks[-1] = now
+        if done() or now - ticks[0] > timeout:
+            loop.quit()
+
+    ticks.insert(0, ticks[0])
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+    QTimer.singleShot(0, start_sync)
+    started = time.perf_counter()
+    loop.exec()
+    timer.stop()
+    return max(gaps) * 1000, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    init_db()
+
+    FlakyStandIn.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/exec"
+    common.fill(common.note_rows(
+        args.rows, text=lambda i, rng: f"1. Note {i}, \"quoted\""
+    ))
+
+    print(f"{args.rows} notes in chunks of {args.chunk}, {args.latency:.1f}s "
+          f"per request, every {FlakyStandIn.fail_every}rd request fails")
+
+    # Blocking: the tray slot runs the sync and retries by hand
+    def blocking_sync():
+        while True:
+            sync_to_google_sheets(url, args.chunk)
+            if not pending_rows():
+                break
+        blocking_done[0] = True
+
+    blocking_done = [False]
+    stall, elapsed = measure_stalls(blocking_sync, lambda: blocking_done[0], 120)
+    check_sheet()
+    print(f"in the slot:   longest event loop stall {stall:8.1f} ms, "
+          f"synced in {elapsed:5.1f}s")
+
+    touch_all("edited")
+    worker = SyncWorker(url, base_delay=0.1, max_delay=1.0, chunk_size=args.chunk)
+    FlakyStandIn.requests = 0
+    stall, elapsed = measure_stalls(
+        worker.request,
+        lambda: worker.status.startswith("Sync: up to date"),
+        120,
+    )
+    worker.stop()
+    check_sheet()
+    print(f"SyncWorker:    longest event loop stall {stall:8.1f} ms, "
+          f"synced in {elapsed:5.1f}s, {worker.failures} retries")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
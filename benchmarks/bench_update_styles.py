@@ -0,0 +1,70 @@
+"""
+Cost of NoteWindow.update_styles(): a full restyle with the shared icon cache
+against the previous per-pixel Python recoloring of every button icon, and
+the call made by every save() when the priority did not change.
+
+Run from the repository root:
+
+    python benchmarks/bench_update_styles.py
+"""
+import argparse
+import sys
+import time
+
+import common  # noqa: F401  (first: sets up the path and database)
+
+from PySide6.QtGui import QIcon, QPixmap
+from PySide6.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+
+from database import Note, init_db  # noqa: E402
+from note_window import NoteWindow  # noqa: E402
+
+
+def legacy_set_button_icon(self, button, icon_path, color=None):
+    icon = QIcon(icon_path)
+    pixmap = icon.pixmap(35, 30)
+    if color is not None:
+        image = pixmap.toImage()
+        for x in range(image.width()):
+            for y in range(image.height()):
+                if image.pixelColor(x, y).alpha() > 0:
+                    image.setPixelColor(x, y, color.toRgb())
+        pixmap = QPixmap.fromImage(image)
+    button.setIcon(QIcon(pixmap))
+
+
+def time_update_styles(note_window, iterations, restyle=True):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if restyle:
+            note_window.theme = None  # Forget the applied theme
+        note_window.update_styles()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    init_db()
+
+    note_window = NoteWindow(
+        note=Note(x=0, y=0, text="", priority="Critical"),
+        active_notewindows={},
+    )
+    cached = time_update_styles(note_window, args.iterations)
+    unchanged = time_update_styles(note_window, args.iterations, restyle=False)
+
+    NoteWindow.set_button_icon = legacy_set_button_icon
+    legacy = time_update_styles(note_window, args.iterations)
+
+    print(f"update_styles() on a Critical note, {args.iterations} calls")
+    print(f"restyle, per-pixel recolor: {legacy:8.3f} ms/call")
+    print(f"restyle, icon cache:        {cached:8.3f} ms/call")
+    print(f"same priority (save path):  {unchanged:8.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Idle timer wakeups with many open notes: one 1 Hz QTimer per note (the old
+countdown design) against the shared DeadlineScheduler.
+
+Run from the repository root:
+
+    python benchmarks/bench_wakeups.py
+"""
+import argparse
+import sys
+import time
+
+import common  # First: sets up the path and database
+
+from PySide6.QtCore import QTimer, QEventLoop
+from PySide6.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+
+from database import Note, init_db  # noqa: E402
+from note_window import NoteWindow  # noqa: E402
+from persistence import write_behind  # noqa: E402
+from scheduler import scheduler  # noqa: E402
+
+
+def create_windows(count, timed_every):
+    active_notewindows = {}
+    rows = common.note_rows(count, timer_every=timed_every, timer_range=(3600, 86400))
+    for row in rows:
+        NoteWindow(note=Note(**row), active_notewindows=active_notewindows)
+    write_behind.flush()
+    return active_notewindows
+
+
+def run_idle(seconds):
+    # A local loop, since QApplication.quit() would also close the notes.
+    loop = QEventLoop()
+    start_cpu = time.process_time()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+    return time.process_time() - start_cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--timed-every", type=int, default=20,
+                        help="every Nth note gets a timer")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    init_db()
+
+    active_notewindows = create_windows(args.notes, args.timed_every)
+    windows = list(active_notewindows.values())
+    run_idle(1.0)  # Let the first layout and paint of every window settle
+
+    # After: shared scheduler only.
+    scheduler.wakeups = 0
+    after_cpu = run_idle(args.seconds)
+    after_wakeups = scheduler.wakeups
+
+    # Before: one 1 Hz QTimer per note repainting it on every tick.
+    scheduler.clear()
+    legacy_wakeups = [0]
+
+    def legacy_tick(note_window):
+        legacy_wakeups[0] += 1
+        note_window.update_countdown()
+        note_window.update()
+
+    timers = []
+    for note_window in windows:
+        timer = QTimer(note_window)
+        timer.timeout.connect(lambda w=note_window: legacy_tick(w))
+        timer.start(1000)
+        timers.append(timer)
+    before_cpu = run_idle(args.seconds)
+
+    print(f"{args.notes} notes, {len(windows[::args.timed_every])} with timers, "
+          f"{args.seconds:.0f}s idle")
+    print(f"{'':8}{'wakeups/s':>12}{'cpu ms/s':>12}")
+    print(f"{'before':8}{legacy_wakeups[0] / args.seconds:12.1f}"
+          f"{before_cpu * 1000 / args.seconds:12.1f}")
+    print(f"{'after':8}{after_wakeups / args.seconds:12.1f}"
+          f"{after_cpu * 1000 / args.seconds:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
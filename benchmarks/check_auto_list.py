@@ -0,0 +1,143 @@
+"""
+Checks that AutoListFormatter gives the same text as utils.auto_list, the
+whole-text formatter it replaced, and compares their cost per edit.
+
+Replays random edit streams (typing, deletions, pastes and loads) on a
+QTextEdit document formatted incrementally, and after every edit compares
+it with auto_list() run on the same edit made to a plain string. Exits with
+status 1 at the first difference. Run from the repository root:
+
+    python benchmarks/check_auto_list.py
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import common  # First: sets up the path and database
+
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QApplication, QTextEdit
+
+app = QApplication(sys.argv)
+
+from formatting import AutoListFormatter  # noqa: E402
+from utils import auto_list  # noqa: E402
+
+# Characters that make, break and renumber list items
+ALPHABET = "\n\n\n- - 1. 2. 10. x.-"
+
+
+def random_edit(text, rng):
+    """Returns (kind, start, end, inserted): replace text[start:end]."""
+    roll = rng.random()
+    if roll < 0.6:
+        position = rng.randint(0, len(text))
+        return "type", position, position, rng.choice(ALPHABET)
+    if roll < 0.85 and text:
+        start = rng.randrange(len(text))
+        return "delete", start, min(len(text), start + rng.randint(1, 4)), ""
+    if roll < 0.98:
+        start = rng.randint(0, len(text))
+        end = min(len(text), start + rng.randint(0, 6))
+        pasted = "".join(rng.choices(ALPHABET, k=rng.randint(2, 12)))
+        return "paste", start, end, pasted
+    return "load", 0, len(text), common.list_text(rng, rng.randint(1, 8))
+
+
+def note_document():
+    """A document set up like NoteWindow's: it only reports contentsChange
+    once a layout exists, which a QTextEdit always gives it."""
+    editor = QTextEdit()
+    return editor, AutoListFormatter(editor.document())
+
+
+def apply_edit(document, formatter, edit):
+    kind, start, end, inserted = edit
+    if kind == "load":
+        document.setPlainText(inserted)
+    else:
+        cursor = QTextCursor(document)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(inserted)
+    formatter.apply()
+
+
+def check_stream(seed, edits):
+    """Returns None, or a description of the first edit where the texts differ."""
+    rng = random.Random(seed)
+    editor, formatter = note_document()
+    document = editor.document()
+    text = ""
+    for step in range(edits):
+        edit = random_edit(text, rng)
+        kind, start, end, inserted = edit
+        expected = auto_list(text[:start] + inserted + text[end:])
+        apply_edit(document, formatter, edit)
+        actual = document.toPlainText()
+        if actual != expected:
+            return (f"seed {seed}, edit {step}: {kind} {inserted!r} at "
+                    f"{start}:{end} of {text!r}\n"
+                    f"  auto_list:          {expected!r}\n"
+                    f"  AutoListFormatter:  {actual!r}")
+        text = actual
+    return None
+
+
+def time_typing(lines, keystrokes):
+    """Median ms per keystroke at the end of a ``lines`` line list: the
+    formatter against auto_list() and setPlainText() of the whole text."""
+    rng = random.Random(1)
+    text = common.list_text(rng, lines)
+    editor, formatter = note_document()
+    document = editor.document()
+    document.setPlainText(text)
+    formatter.apply()
+    incremental = []
+    for _ in range(keystrokes):
+        start = time.perf_counter()
+        apply_edit(document, formatter, ("type", len(text), len(text), "x"))
+        incremental.append((time.perf_counter() - start) * 1000)
+        text += "x"
+
+    whole = []
+    editor = QTextEdit()
+    document = editor.document()
+    document.setPlainText(text)
+    for _ in range(keystrokes):
+        start = time.perf_counter()
+        text = auto_list(document.toPlainText() + "x")
+        document.setPlainText(text)
+        whole.append((time.perf_counter() - start) * 1000)
+    return statistics.median(incremental), statistics.median(whole)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=300,
+                        help="edits per stream")
+    parser.add_argument("--seed", type=int, default=1, help="first stream's seed")
+    parser.add_argument("--lines", type=int, default=2000,
+                        help="length of the note typed into for the timings")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for seed in range(args.seed, args.seed + args.streams):
+        failure = check_stream(seed, args.edits)
+        if failure:
+            print(f"FAIL: {failure}")
+            sys.exit(1)
+    print(f"{args.streams} streams of {args.edits} edits identical to auto_list "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    incremental, whole = time_typing(args.lines, 200)
+    print(f"typing at the end of {args.lines} lines, median ms per keystroke:")
+    print(f"  AutoListFormatter.apply()      {incremental:8.3f}")
+    print(f"  auto_list() + setPlainText()   {whole:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
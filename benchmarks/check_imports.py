@@ -0,0 +1,85 @@
+"""
+Cold-start import cost of main.py, measured with python -X importtime.
+
+Runs the module-level imports of main.py in fresh interpreters and lists the
+slowest modules. Exits with status 1 if a module that should only load on
+first use is imported at startup, or if the total is over --budget-ms. Run
+from the repository root:
+
+    python benchmarks/check_imports.py
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+from common import ROOT  # Also gives the child processes a scratch database
+
+# Imported on first use: opening the dashboard, syncing or notifying
+DEFERRED = ["dashboard", "sync", "urllib.request", "notify2", "dbus", "playsound"]
+
+
+def startup_imports(path):
+    """Returns the module-level import statements of ``path`` as source."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(
+        ast.unparse(node) for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_times(code):
+    """Returns {module: (self us, cumulative us)} and the total in us."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float,
+                        help="fail if the median total is over this")
+    args = parser.parse_args()
+
+    code = startup_imports(os.path.join(ROOT, "main.py"))
+    runs = [import_times(code) for _ in range(args.repeat)]
+    modules = runs[-1][0]
+    total_ms = statistics.median(total for _, total in runs) / 1000
+
+    print(f"main.py imports: {total_ms:.1f} ms (median of {args.repeat}), "
+          f"{len(modules)} modules")
+    print(f"{'module':40}{'self ms':>10}{'cumul ms':>10}")
+    slowest = sorted(modules.items(), key=lambda item: -item[1][0])
+    for name, (self_us, cumulative_us) in slowest[:args.top]:
+        print(f"{name:40}{self_us / 1000:10.1f}{cumulative_us / 1000:10.1f}")
+
+    failed = False
+    eager = [name for name in DEFERRED if name in modules]
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"FAIL: {total_ms:.1f} ms is over the {args.budget_ms:.1f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
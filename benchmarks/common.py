@@ -0,0 +1,96 @@
+"""
+Shared setup and corpora for the benchmarks.
+
+Importing this module puts the repository on sys.path, runs Qt offscreen and
+points the app at a database in a fresh temporary directory, removed with
+everything else written there when the benchmark exits. Benchmarks import it
+before any module of the app:
+
+    import common  # First: sets up the path and database
+"""
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, BENCH_DIR, ignore_errors=True)
+
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault(
+    "NOTES_DATABASE_URL", f"sqlite:///{os.path.join(BENCH_DIR, 'bench_notes.db')}"
+)
+
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+
+WORDS = (
+    "buy coffee review deploy server invoice report meeting budget design "
+    "sprint bug fix release cursor list timer deadline sync export"
+).split()
+
+
+def list_text(rng, lines, words=WORDS):
+    """A numbered list of ``lines`` lines of random words."""
+    return "\n".join(
+        f"{n}. " + " ".join(rng.choices(words, k=rng.randint(2, 8)))
+        for n in range(1, lines + 1)
+    )
+
+
+def note_rows(count, seed=1, text=None, long_every=0, long_lines=40,
+              timer_every=0, timer_range=(60, 86400), stuck_every=0):
+    """
+    Returns ``count`` synthetic note rows for insert_notes(): short lists,
+    every ``long_every``th one ``long_lines`` lines long, every
+    ``timer_every``th one due within ``timer_range`` seconds from now and
+    every ``stuck_every``th one stuck. ``text(i, rng)`` replaces the lists.
+    """
+    rng = random.Random(seed)
+    now = int(time.time())
+    rows = []
+    for i in range(count):
+        if text is not None:
+            note_text = text(i, rng)
+        else:
+            long = long_every and i % long_every == 0
+            note_text = list_text(rng, long_lines if long else rng.randint(1, 6))
+        timed = bool(timer_every) and i % timer_every == 0
+        rows.append({
+            "x": rng.randrange(1000),
+            "y": rng.randrange(700),
+            "text": note_text,
+            "priority": rng.choice(PRIORITIES),
+            "timer_enabled": timed,
+            "timer_time": now + rng.randint(*timer_range) if timed else None,
+            "stuck": bool(stuck_every) and i % stuck_every == 0,
+        })
+    return rows
+
+
+def fill(rows, batch_size=5000):
+    """Inserts ``rows`` into the benchmark database; returns their ids."""
+    from database import engine, insert_notes
+
+    ids = []
+    with engine.begin() as connection:
+        for start in range(0, len(rows), batch_size):
+            ids += insert_notes(connection, rows[start:start + batch_size])
+    return ids
+
+
+def detached_notes(count, **kwargs):
+    """Returns Note objects numbered from 1 that are not in the database,
+    for models and windows fed without a session. Takes note_rows() options."""
+    from database import Note
+
+    notes = []
+    for note_id, row in enumerate(note_rows(count, **kwargs), 1):
+        note = Note(**row)
+        note.id = note_id
+        notes.append(note)
+    return notes
@@ -0,0 +1,247 @@
+"""
+Headless benchmark suite for the hot paths: startup, typing in a note,
+dashboard rebuilds and searches, idle wakeups and sync serialization.
+
+Runs offscreen against a temporary database filled with a synthetic corpus
+and can write the results as JSON to compare them across commits. Run from
+the repository root:
+
+    python benchmarks/suite.py --json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import common  # First: sets up the path and database
+
+from PySide6 import __version__ as pyside_version
+from PySide6.QtCore import QEventLoop, Qt, QTimer
+from PySide6.QtGui import QIcon
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon
+
+app = QApplication(sys.argv)
+
+from dashboard import Dashboard  # noqa: E402
+from database import Note, engine, init_db  # noqa: E402
+from note_manager import NoteManager  # noqa: E402
+from note_window import NoteWindow  # noqa: E402
+from persistence import write_behind  # noqa: E402
+from scheduler import scheduler  # noqa: E402
+from sync import iter_change_chunks, read_state  # noqa: E402
+
+SCENARIOS = ["startup", "typing", "dashboard", "idle", "sync"]
+
+
+def percentiles(samples):
+    return {
+        "p50": statistics.median(samples),
+        "p99": statistics.quantiles(samples, n=100, method="inclusive")[98],
+        "max": max(samples),
+    }
+
+
+def run_events(seconds):
+    # A local loop, since QApplication.quit() would also close the notes.
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def bench_startup(context, args):
+    start = time.perf_counter()
+    note_manager = NoteManager()
+    note_manager.load()
+    loaded = time.perf_counter()
+    tray = QSystemTrayIcon()
+    tray.setIcon(QIcon(os.path.join("resources", "sticky-note.png")))
+    tray.setVisible(True)
+    end = time.perf_counter()
+    context["note_manager"] = note_manager
+    context["tray"] = tray
+    return {
+        "load_ms": (loaded - start) * 1000,
+        "to_tray_ms": (end - start) * 1000,
+        "windows": len(note_manager.windows),
+    }
+
+
+def bench_typing(context, args):
+    note = Note(
+        x=0, y=0, priority="High",
+        text="\n".join(f"{n}. item {n}" for n in range(1, args.long_lines + 1)),
+    )
+    note_window = NoteWindow(note=note, active_notewindows={})
+    editor = note_window.text
+    editor.moveCursor(editor.textCursor().MoveOperation.End)
+    run_events(0.2)
+
+    # Each new line is auto-numbered, then a few words are typed into it
+    keys = [Qt.Key.Key_Return] + list("type a few words...")
+    latencies = []
+    for i in range(args.keystrokes):
+        start = time.perf_counter()
+        QTest.keyClick(editor, keys[i % len(keys)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    write_behind.flush()
+    flush_ms = (time.perf_counter() - start) * 1000
+    note_window.close()
+    return {
+        "keystrokes": len(latencies),
+        "note_lines": editor.document().blockCount(),
+        "keystroke_ms": percentiles(latencies),
+        "flush_ms": flush_ms,
+    }
+
+
+def bench_dashboard(context, args):
+    note_manager = context.get("note_manager")
+    if note_manager is None:
+        note_manager = context["note_manager"] = NoteManager()
+        note_manager.load()
+
+    start = time.perf_counter()
+    dashboard = Dashboard(note_manager)
+    dashboard.show()
+    QApplication.processEvents()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    sort_ms = {}
+    for criteria in ["Time Remaining", "ID", "Text", "Timer", "Priority"]:
+        start = time.perf_counter()
+        dashboard.sorting_criteria.setCurrentText(criteria)
+        QApplication.processEvents()
+        sort_ms[criteria] = (time.perf_counter() - start) * 1000
+
+    # A query typed a letter at a time, each searched as if typing paused
+    search_ms = {}
+    for query in ["b", "bu", "buy", "buy c", ""]:
+        start = time.perf_counter()
+        dashboard.search(query)
+        QApplication.processEvents()
+        search_ms[query or "cleared"] = (time.perf_counter() - start) * 1000
+
+    dashboard.hide()
+    return {
+        "rows": dashboard.model.rowCount(),
+        "build_ms": build_ms,
+        "sort_ms": sort_ms,
+        "search_ms": search_ms,
+    }
+
+
+def bench_idle(context, args):
+    run_events(1.0)  # Let the first layout and paint of every window settle
+    scheduler.wakeups = 0
+    start_cpu = time.process_time()
+    run_events(args.idle_seconds)
+    cpu = time.process_time() - start_cpu
+    return {
+        "seconds": args.idle_seconds,
+        "wakeups_per_s": scheduler.wakeups / args.idle_seconds,
+        "cpu_ms_per_s": cpu * 1000 / args.idle_seconds,
+    }
+
+
+def bench_sync(context, args):
+    with engine.connect() as connection:
+        until = read_state(connection, "revision")
+        start = time.perf_counter()
+        rows = size = 0
+        for body, count, revision in iter_change_chunks(connection, 0, until):
+            rows += count
+            size += len(body.encode("utf-8"))
+        elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "bytes": size,
+        "rows_per_s": rows / elapsed,
+        "mb_per_s": size / elapsed / 1e6,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, prefix=""):
+    for name, value in results.items():
+        if isinstance(value, dict):
+            print(f"{prefix}{name}:")
+            print_results(value, prefix + "  ")
+        elif isinstance(value, float):
+            print(f"{prefix}{name:22}{value:12.2f}")
+        else:
+            print(f"{prefix}{name:22}{value:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--long-every", type=int, default=50,
+                        help="every Nth note is a long note")
+    parser.add_argument("--long-lines", type=int, default=200)
+    parser.add_argument("--timer-every", type=int, default=5,
+                        help="every Nth note has a timer")
+    parser.add_argument("--stuck-every", type=int, default=50,
+                        help="every Nth note is stuck on screen")
+    parser.add_argument("--keystrokes", type=int, default=400)
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    parser.add_argument("--only", default=",".join(SCENARIOS),
+                        help="comma-separated scenarios to run, in order")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write the results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+    init_db()
+
+    start = time.perf_counter()
+    common.fill(common.note_rows(
+        args.notes, long_every=args.long_every, long_lines=args.long_lines,
+        timer_every=args.timer_every, timer_range=(-600, 86400),
+        stuck_every=args.stuck_every,
+    ))
+    corpus_s = time.perf_counter() - start
+
+    context = {}
+    results = {}
+    for name in args.only.split(","):
+        results[name] = globals()[f"bench_{name}"](context, args)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "pyside": pyside_version,
+        "platform": platform.platform(),
+        "parameters": {
+            key: value for key, value in vars(args).items() if key != "json"
+        },
+        "corpus_seconds": corpus_s,
+        "results": results,
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    print(f"{args.notes} notes, revision {report['revision']}")
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
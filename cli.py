@@ -0,0 +1,98 @@
+"""
+Command line access to the running Sticky Notes instance.
+
+    python cli.py add "Buy milk"
+    python cli.py list
+    python cli.py show 3
+    python cli.py import notes.csv backup.json journal/ --sections
+
+Commands are forwarded to main.py, which owns the database, so this starts
+in milliseconds and never opens notes.db itself. Only an import with no
+instance running writes to the database directly.
+"""
+import argparse
+import os
+import sys
+import time
+
+from ipc import NOT_RUNNING, CommandError, send_command
+
+
+def format_time(timestamp):
+    if timestamp is None:
+        return ""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+def run_import(paths, sections):
+    """Returns (notes imported, seconds)."""
+    paths = [os.path.abspath(path) for path in paths]
+    for path in paths:
+        if not os.path.exists(path):
+            raise ValueError(f"No such file or directory: {path}")
+    try:
+        result = send_command("import", paths, sections, timeout=None)
+        return result["count"], result["seconds"]
+    except NOT_RUNNING:
+        pass
+    # Nothing else has the database open
+    from database import init_db
+    from importer import import_files
+    init_db()
+    start = time.perf_counter()
+    count = len(import_files(paths, sections))
+    return count, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="add a note on screen")
+    add.add_argument("text", nargs="?", default="",
+                     help="note text; - reads it from standard input")
+    commands.add_parser("list", help="list every note")
+    show = commands.add_parser("show", help="print one note")
+    show.add_argument("id", type=int)
+    import_ = commands.add_parser(
+        "import", help="import notes from CSV, JSON or Markdown files"
+    )
+    import_.add_argument("paths", nargs="+", help="files or directories")
+    import_.add_argument("--sections", action="store_true",
+                         help="one note per Markdown section, not per file")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "add":
+            text = sys.stdin.read() if args.text == "-" else args.text
+            print(send_command("add", text)["id"])
+        elif args.command == "list":
+            for note in send_command("list"):
+                print(f"{note['id']:>6}  {note['priority']:8}  "
+                      f"{'stuck' if note['stuck'] else '':5}  "
+                      f"{format_time(note['timer_time']):16}  {note['preview']}")
+        elif args.command == "import":
+            count, seconds = run_import(args.paths, args.sections)
+            print(f"Imported {count} notes in {seconds:.2f}s "
+                  f"({count / max(seconds, 1e-9):.0f} notes/s)")
+        else:
+            note = send_command("show", args.id)
+            print(f"#{note['id']}  {note['priority']}"
+                  + (f"  timer {format_time(note['timer_time'])}"
+                     if note['timer_time'] is not None else ""))
+            print(note["text"])
+    except (CommandError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except NOT_RUNNING:
+        print("Sticky Notes is not running; start it with python main.py",
+              file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Sticky Notes is running but did not answer ({e}); "
+              "try again once it has started", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
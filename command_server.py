@@ -0,0 +1,113 @@
+import json
+import time
+from functools import partial
+
+from PySide6.QtCore import QObject
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from importer import import_files
+from ipc import encode, server_address
+from persistence import write_behind
+
+
+class CommandServer(QObject):
+    """
+    Answers commands from later launches and cli.py on a local socket.
+
+    The first instance listens and owns the database; other processes only
+    forward commands to it. Commands run on the GUI thread like any other
+    event, so they see and change the same notes as the windows.
+    """
+
+    def __init__(self, note_manager, parent=None):
+        super().__init__(parent)
+        self.note_manager = note_manager
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+        self.commands = {
+            "add": self.add,
+            "list": self.list_notes,
+            "show": self.show,
+            "import": self.import_files,
+        }
+
+    def register(self, name, function):
+        self.commands[name] = function
+
+    def listen(self):
+        """Returns False if another instance is already listening."""
+        address = server_address()
+        if self.server.listen(address):
+            return True
+        probe = QLocalSocket()
+        probe.connectToServer(address)
+        if probe.waitForConnected(500):
+            probe.disconnectFromServer()
+            return False
+        # Left behind by an instance that did not shut down cleanly
+        QLocalServer.removeServer(address)
+        return self.server.listen(address)
+
+    def _accept(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(partial(self._read, connection))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def _read(self, connection):
+        if not connection.canReadLine():
+            return
+        try:
+            request = json.loads(bytes(connection.readLine()))
+            command = self.commands.get(request["command"])
+            if command is None:
+                reply = {"error": f"Unknown command: {request['command']}"}
+            else:
+                reply = {"result": command(*request.get("args", []))}
+        except Exception as e:
+            print(f"Error running command: {e}")
+            reply = {"error": str(e)}
+        connection.write(encode(reply))
+        connection.flush()
+        connection.disconnectFromServer()
+
+    def add(self, text=""):
+        note_window = self.note_manager.create_note()
+        if text:
+            # Saved and formatted like typed text
+            note_window.text.setPlainText(text)
+        return {"id": note_window.note.id}
+
+    def list_notes(self):
+        return [
+            {
+                "id": note.id,
+                "priority": note.priority,
+                "stuck": note.stuck is not False,
+                "timer_time": note.timer_time if note.timer_enabled else None,
+                "preview": (note.preview or "").split("\n", 1)[0],
+            }
+            for note in sorted(self.note_manager.notes.values(), key=lambda note: note.id)
+        ]
+
+    def show(self, note_id):
+        note = self.note_manager.notes.get(int(note_id))
+        if note is None:
+            raise ValueError(f"No note with id {note_id}")
+        return {
+            "id": note.id,
+            "priority": note.priority,
+            "stuck": note.stuck is not False,
+            "timer_time": note.timer_time if note.timer_enabled else None,
+            "text": note.text or "",
+        }
+
+    def import_files(self, paths, sections=False):
+        # The import commits on a connection of its own
+        write_behind.flush()
+        start = time.perf_counter()
+        ids = import_files(paths, sections)
+        seconds = time.perf_counter() - start
+        self.note_manager.load_imported(ids)
+        return {"count": len(ids), "seconds": seconds}
@@ -1,23 +1,484 @@
-from PySide6.QtCore import Qt, QTimer, QDateTime
+import time
+from contextlib import contextmanager
+
+from PySide6.QtCore import (
+    Qt,
+    QDateTime,
+    QAbstractTableModel,
+    QModelIndex,
+    QEvent,
+    QRectF,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QColor, QPainter, QPen, QFont
 from PySide6.QtWidgets import (
     QDialog,
     QVBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
-    QPushButton,
-    QHBoxLayout,
+    QTableView,
     QHeaderView,
     QTextEdit,
     QLabel,
-    QWidget,
     QComboBox,
+    QStyledItemDelegate,
+    QAbstractItemView,
+    QLineEdit,
+    QListWidget,
+    QPushButton,
 )
 
+from database import (
+    make_snippet,
+    note_text,
+    search_matches,
+    search_notes,
+    session,
+)
+from history import history
+from metrics import metrics
+from scheduler import scheduler
+from sort_index import SortIndex
+from themes import theme_for
+
+
+PRIORITY_COLUMN = 0
+ID_COLUMN = 1
+TEXT_COLUMN = 2
+TIMER_COLUMN = 3
+TIME_REMAINING_COLUMN = 4
+ACTIONS_COLUMN = 5
+
+# Rows added to the table each time it is scrolled near the end; while
+# searching, the best ranked page of matches also gets its snippets up front
+# and the others get theirs when they are hovered
+PAGE_SIZE = 200
+
+# Typing pauses this long before the table is searched
+SEARCH_DELAY_MS = 150
+
+PRIORITY_RANKS = {"Critical": 1, "High": 2, "Medium": 3, "Low": 4}
+
+
+def timer_running(note, now):
+    return bool(note.timer_enabled) and note.timer_time is not None and (
+        note.timer_time > now
+    )
+
+
+def format_time_remaining(note):
+    if not note.timer_enabled:
+        return ""
+    if note.timer_time is None:
+        return "N/A"
+    remaining = note.timer_time - int(time.time())
+    if remaining < 0:
+        return "Timer Expired"
+    days, seconds = divmod(remaining, 24 * 3600)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{days}d {hours}h {minutes}m {seconds}s"
+
+
+def priority_key(note):
+    return PRIORITY_RANKS.get(note.priority, 5)  # Lower value means higher priority
+
+
+def time_remaining_key(note):
+    # Running timers by deadline epoch, which orders them by time remaining
+    # without looking at the clock; expired timers and no timer go last.
+    if timer_running(note, time.time()):
+        return (0, note.timer_time)
+    return (1, 0)
+
+
+SORT_KEYS = {
+    "Priority": priority_key,
+    "Time Remaining": time_remaining_key,
+    "ID": lambda note: note.id,
+    "Text": lambda note: note.preview or "",
+    "Timer": lambda note: bool(note.timer_enabled),
+}
+
+
+class NoteTableModel(QAbstractTableModel):
+    """
+    The dashboard's rows, in the order of a SortIndex per sort criterion.
+
+    Paging keeps the view's work to the rows fetched so far, but not the
+    model's memory: it refers to the NoteRecord of every note, which
+    NoteManager holds anyway, and each index used adds a (key, id) entry
+    and a dict item per note. Every index is kept sorted through each
+    change, so re-sorting shows one as it is and searching filters one.
+    """
+
+    header_labels = [
+        "Priority",
+        "ID",
+        "Text",
+        "Timer",
+        "Time Remaining",
+        "Actions",
+    ]
+
+    def __init__(self, notes, parent=None):
+        super().__init__(parent)
+        self.note_by_id = {note.id: note for note in notes}
+        self.snippets = {}  # Note id -> search snippet, shown as a tooltip
+        self.search_terms = []
+        self.matches = None  # Ids of the notes found while searching
+        # A sort index per criterion used so far, each kept up to date on
+        # every change; rows are shown in the order of self.order, which is
+        # one of them or, while searching, an index of the matches only.
+        self.indexes = {}
+        self.criteria = "Priority"
+        self.order = None
+        self.order = self.sort_index(self.criteria)
+        # Only the first rows of self.order are in the table; the view asks
+        # for more pages through canFetchMore() and fetchMore() as it scrolls.
+        self.fetched = min(PAGE_SIZE, len(self.order))
+        self.changing = False
+
+    def sort_index(self, criteria):
+        index = self.indexes.get(criteria)
+        if index is None:
+            index = SortIndex(SORT_KEYS[criteria], self.note_by_id.values())
+            self.indexes[criteria] = index
+            self.schedule_expiry()
+        return index
+
+    def matching_index(self, criteria):
+        return self.sort_index(criteria).subset(self.matches)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.fetched
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.fetched < len(self.order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.changing:
+            return
+        count = min(PAGE_SIZE, len(self.order) - self.fetched)
+        if count <= 0:
+            return
+        metrics.count("dashboard.page_fetched")
+        with self.changing_rows():
+            self.beginInsertRows(
+                QModelIndex(), self.fetched, self.fetched + count - 1
+            )
+            self.fetched += count
+            self.endInsertRows()
+
+    @contextmanager
+    def changing_rows(self):
+        # Views may call fetchMore() from the signals sent while rows are
+        # inserted, moved or removed or the model is reset, before
+        # self.fetched is up to date.
+        self.changing = True
+        try:
+            yield
+        finally:
+            self.changing = False
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.header_labels)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.header_labels[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        note = self.note_at(index.row())
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == ID_COLUMN:
+                return str(note.id)
+            elif column == TEXT_COLUMN:
+                return (note.preview or "")[:50]
+            elif column == TIMER_COLUMN:
+                return "Yes" if note.timer_enabled else "No"
+            elif column == TIME_REMAINING_COLUMN:
+                return format_time_remaining(note)
+            elif column == ACTIONS_COLUMN:
+                return "Stick" if note.stuck is False else "Unstick"
+        elif role == Qt.ItemDataRole.ToolTipRole and column == PRIORITY_COLUMN:
+            return note.priority  # Show priority on hover
+        elif role == Qt.ItemDataRole.ToolTipRole and column == TEXT_COLUMN:
+            return self.snippet(note.id)
+        elif role == Qt.ItemDataRole.BackgroundRole and column == PRIORITY_COLUMN:
+            return theme_for(note.priority).bg_color
+        return None
+
+    def note_at(self, row):
+        return self.note_by_id[self.order.id_at(row)]
+
+    def snippet(self, note_id):
+        if self.matches is None or note_id not in self.matches:
+            return None
+        snippet = self.snippets.get(note_id)
+        if snippet is None:
+            # Not among the ranked matches; made on first hover instead
+            snippet = make_snippet(note_text(note_id), self.search_terms)
+            self.snippets[note_id] = snippet
+        return snippet
+
+    def note_for_id(self, note_id):
+        return self.note_by_id.get(note_id)
+
+    def row_for_id(self, note_id):
+        """Returns the table row of the note, or None if not fetched yet."""
+        if note_id not in self.order:
+            return None
+        row = self.order.row_of(note_id)
+        return row if row < self.fetched else None
+
+    def show_order(self, order):
+        # Every index is already sorted; start over from its first page
+        with self.changing_rows():
+            self.beginResetModel()
+            self.order = order
+            self.fetched = min(PAGE_SIZE, len(order))
+            self.endResetModel()
+        self.schedule_expiry()
+
+    @metrics.timed("dashboard.sort")
+    def set_criteria(self, criteria):
+        self.criteria = criteria
+        if self.matches is None:
+            self.show_order(self.sort_index(criteria))
+        else:
+            self.show_order(self.matching_index(criteria))
+
+    def set_matches(self, matches, narrow=False):
+        """
+        Shows only the notes whose ids are in the set ``matches``, or every
+        note if it is None. ``narrow`` says they are among the notes shown,
+        which are then filtered instead of every note.
+        """
+        narrow = narrow and self.matches is not None
+        self.matches = matches
+        if matches is None:
+            self.show_order(self.sort_index(self.criteria))
+        elif narrow:
+            self.show_order(self.order.subset(matches))
+        else:
+            self.show_order(self.matching_index(self.criteria))
+
+    def other_indexes(self):
+        return [index for index in self.indexes.values() if index is not self.order]
+
+    def move_row(self, note):
+        """
+        Moves ``note`` to the row its new sort key belongs in and returns
+        that row, or None if the note is now past the fetched rows.
+        """
+        row, destination, note_key = self.order.move_target(note)
+        new_row = destination - 1 if destination > row else destination
+        if destination in (row, row + 1):
+            self.order.move(note.id, row, destination, note_key)
+        elif row < self.fetched and new_row < self.fetched:
+            metrics.count("dashboard.row_move")
+            with self.changing_rows():
+                self.beginMoveRows(
+                    QModelIndex(), row, row, QModelIndex(), destination
+                )
+                self.order.move(note.id, row, destination, note_key)
+                self.endMoveRows()
+        elif row < self.fetched:
+            # Moves out of the fetched rows
+            with self.changing_rows():
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self.order.move(note.id, row, destination, note_key)
+                self.fetched -= 1
+                self.endRemoveRows()
+        elif new_row < self.fetched:
+            # Moves into the fetched rows
+            with self.changing_rows():
+                self.beginInsertRows(QModelIndex(), new_row, new_row)
+                self.order.move(note.id, row, destination, note_key)
+                self.fetched += 1
+                self.endInsertRows()
+        else:
+            self.order.move(note.id, row, destination, note_key)
+        return new_row if new_row < self.fetched else None
+
+    def note_changed(self, note):
+        if note.id not in self.note_by_id:
+            return
+        metrics.count("dashboard.row_update")
+        self.note_by_id[note.id] = note  # A Note may replace a NoteRecord
+        for index in self.other_indexes():
+            index.update(note)
+        if note.id in self.order:
+            row = self.move_row(note)
+            if row is not None:
+                self.dataChanged.emit(
+                    self.index(row, 0), self.index(row, self.columnCount() - 1)
+                )
+        self.schedule_expiry()
+
+    def add_note(self, note):
+        if note.id in self.note_by_id:
+            return
+        self.note_by_id[note.id] = note
+        for index in self.other_indexes():
+            index.add(note)
+        if self.matches is None:
+            row = self.order.insertion_row(note)
+            if row < self.fetched or self.fetched == len(self.order):
+                with self.changing_rows():
+                    self.beginInsertRows(QModelIndex(), row, row)
+                    self.order.add(note)
+                    self.fetched += 1
+                    self.endInsertRows()
+            else:
+                self.order.add(note)
+        self.schedule_expiry()
+
+    def add_notes(self, notes):
+        # Merging many notes into each index beats inserting them one by one
+        notes = [note for note in notes if note.id not in self.note_by_id]
+        for note in notes:
+            self.note_by_id[note.id] = note
+        for index in self.other_indexes():
+            index.add_many(notes)
+        if self.matches is None:
+            self.order.add_many(notes)
+            self.show_order(self.order)
+        else:
+            self.schedule_expiry()
+
+    def remove_note(self, note):
+        if note.id not in self.note_by_id:
+            return
+        for index in self.other_indexes():
+            index.remove(note.id)
+        if note.id in self.order:
+            row = self.order.row_of(note.id)
+            if row < self.fetched:
+                with self.changing_rows():
+                    self.beginRemoveRows(QModelIndex(), row, row)
+                    self.order.remove(note.id)
+                    self.fetched -= 1
+                    self.endRemoveRows()
+            else:
+                self.order.remove(note.id)
+        del self.note_by_id[note.id]
+
+    def time_indexes(self):
+        indexes = list(self.indexes.values())
+        if self.order is not None and self.order not in indexes:
+            indexes.append(self.order)
+        return [index for index in indexes if index.key is time_remaining_key]
+
+    def schedule_expiry(self):
+        # Running timers sort first, by deadline, so the next timer to expire
+        # is the first entry of each time index.
+        deadlines = [
+            index.key_at(0)[1]
+            for index in self.time_indexes()
+            if len(index) and index.key_at(0)[0] == 0
+        ]
+        if deadlines:
+            scheduler.schedule(self.expire_timers, min(deadlines))
+        else:
+            scheduler.cancel(self.expire_timers)
+
+    def expire_timers(self):
+        # Re-rank only the notes whose timers just expired
+        now = time.time()
+        for index in self.time_indexes():
+            while len(index) and index.key_at(0)[0] == 0 and (
+                index.key_at(0)[1] <= now
+            ):
+                note = self.note_by_id[index.id_at(0)]
+                if index is self.order:
+                    self.move_row(note)
+                else:
+                    index.update(note)
+        self.schedule_expiry()
+
+    def refresh_time_remaining(self, row):
+        # Display-only change; the order only changes when a timer expires.
+        index = self.index(row, TIME_REMAINING_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+
+
+class PriorityDelegate(QStyledItemDelegate):
+    """Paints the priority swatch instead of a QLabel per row."""
+
+    def paint(self, painter, option, index):
+        color = index.data(Qt.ItemDataRole.BackgroundRole)
+        if color is None:
+            return
+        painter.save()
+        painter.fillRect(option.rect.adjusted(4, 2, -4, -2), color)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setWidth(60)
+        return size
+
+
+class StickButtonDelegate(QStyledItemDelegate):
+    """Paints the Stick/Unstick button and reports clicks on it."""
+
+    clicked = Signal(QModelIndex)
+
+    def button_rect(self, option):
+        return QRectF(option.rect.adjusted(6, 3, -6, -3))
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.button_rect(option)
+        painter.setPen(QPen(QColor("#62622f"), 1))
+        painter.setBrush(QColor("lightblue"))
+        painter.drawRoundedRect(rect, 5, 5)
+        font = QFont(option.font)
+        font.setBold(True)
+        font.setPixelSize(12)
+        painter.setFont(font)
+        painter.setPen(QColor("black"))
+        painter.drawText(
+            rect, Qt.AlignmentFlag.AlignCenter,
+            index.data(Qt.ItemDataRole.DisplayRole)
+        )
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setWidth(max(size.width(), 80))  # min-width 60px plus padding
+        return size
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and event.button() == Qt.MouseButton.LeftButton
+            and self.button_rect(option).contains(event.position())
+        ):
+            self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
+
 
 class Dashboard(QDialog):
-    def __init__(self, active_notewindows, parent=None):
+    @metrics.timed("dashboard.build")
+    def __init__(self, note_manager, parent=None):
         super().__init__(parent)
-        self.active_notewindows = active_notewindows
+        self.note_manager = note_manager
         self.setWindowTitle("Notes Dashboard")
         self.setGeometry(100, 100, 800, 600)
 
@@ -35,253 +496,196 @@ class Dashboard(QDialog):
             ]
         )  # Add sorting options
         self.sorting_criteria.currentIndexChanged.connect(
-            self.populate_table
-        )  # Repopulate table on change
+            self.sort_table
+        )  # Re-sort table on change
         self.layout.addWidget(self.sorting_criteria)
 
-        self.table = QTableWidget()
+        # Full-text search, filtering the table as you type
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search notes")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.search_later)
+        self.layout.addWidget(self.search_box)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(
+            lambda: self.search(self.search_box.text())
+        )
+        self.query = ""  # The query the table shows the matches of
+
+        self.model = NoteTableModel(self.note_manager.notes.values(), self)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setStyleSheet(
             "QHeaderView::section {background-color: #FFFF99; color: #62622f;}"
         )
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+
+        self.priority_delegate = PriorityDelegate(self.table)
+        self.table.setItemDelegateForColumn(
+            PRIORITY_COLUMN, self.priority_delegate
+        )
+        self.stick_delegate = StickButtonDelegate(self.table)
+        self.stick_delegate.clicked.connect(self.toggle_note)
+        self.table.setItemDelegateForColumn(ACTIONS_COLUMN, self.stick_delegate)
 
-        self.table.setColumnCount(6)
-        header_labels = [
-            "Priority",
-            "ID",
-            "Text",
-            "Timer",
-            "Time Remaining",
-            "Actions",
-        ]
-        self.table.setHorizontalHeaderLabels(header_labels)
         self.table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeToContents
         )
+        # Columns fit the rows on screen; measuring every fetched row took
+        # longer than the search that had just refilled the table
+        self.table.horizontalHeader().setResizeContentsPrecision(0)
         self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.resizeRowsToContents()
-        self.table.setColumnWidth(0, 50)
-        self.table.setColumnWidth(1, 20)
         self.layout.addWidget(self.table)
 
-        self.populate_table()
-        self.table.cellClicked.connect(self.show_details)
+        self.table.clicked.connect(self.show_details)
 
-        # Connect note_updated signal to populate_table
-        for note_window_id, note_window in self.active_notewindows.items():
-            note_window.note_updated.connect(self.populate_table)
+        # Update a single row whenever its note changes
+        self.note_manager.note_changed.connect(self.model.note_changed)
+        self.note_manager.note_added.connect(self.model.add_note)
+        self.note_manager.notes_added.connect(self.model.add_notes)
+        self.note_manager.note_removed.connect(self.model.remove_note)
 
         self.setLayout(self.layout)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time_remaining)
-        self.timer.start(1000)  # Update every 1 second
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Countdowns share the application-wide display tick while shown
+        scheduler.watch(self.update_time_remaining)
 
-    def populate_table(self):
-        self.table.setRowCount(0)
-        # Get selected sorting criteria
-        sorting_criteria = self.sorting_criteria.currentText()
-
-        # Sort the note windows based on the selected criteria
-        sorted_note_windows = sorted(
-            self.active_notewindows.items(),
-            key=lambda item: self.get_sorting_key(item[1], sorting_criteria),
-        )
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        scheduler.unwatch(self.update_time_remaining)
 
-        for note_window_id, note_window in sorted_note_windows:
-            note = note_window.note
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
+    def sort_table(self):
+        self.model.set_criteria(self.sorting_criteria.currentText())
 
-            # Create a colored label based on priority
-            priority_color = self.get_priority_color(note.priority)
-            color_label = QLabel()
-            color_label.setStyleSheet(
-                f"background-color: {priority_color}; border: none;"
-            )
-            color_label.setFixedSize(60, 100)  # Adjust size as needed
-            color_label.setToolTip(note.priority)  # Show priority on hover
-            color_widget = QWidget()
-            color_layout = QHBoxLayout()
-            color_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            color_layout.setContentsMargins(0, 0, 0, 0)
-            color_layout.addWidget(color_label)
-            color_widget.setLayout(color_layout)
-            self.table.setCellWidget(row_position, 0, color_widget)
-            self.table.setItem(
-                row_position, 1, QTableWidgetItem(str(note.id))
-            )
-            note_text = note.text[:50]
-            self.table.setItem(
-                row_position, 2, QTableWidgetItem(note_text)
-            )
-            timer_status = "Yes" if note.timer_enabled else "No"
-            self.table.setItem(
-                row_position, 3, QTableWidgetItem(timer_status)
-            )
+    def search_later(self):
+        # Every keystroke restarts the wait, so a word typed quickly is
+        # searched once
+        self.search_timer.start()
 
-            self.table.setItem(row_position, 4, QTableWidgetItem(""))
-            self.update_time_remaining()
-
-            actions_widget = self.create_action_buttons(note_window)
-            self.table.setCellWidget(row_position, 5, actions_widget)
-
-    def get_sorting_key(self, note_window, criteria):
-        note = note_window.note
-        if criteria == "Priority":
-            priority_values = {"Critical": 1, "High": 2, "Medium": 3, "Low": 4}
-            return priority_values.get(note.priority, 5)  # Lower value means higher priority
-        elif criteria == "Time Remaining":
-            if note.timer_enabled and note.timer_time is not None:
-                timer_time_epoch = QDateTime.fromSecsSinceEpoch(
-                    note.timer_time
-                ).toMSecsSinceEpoch()
-                current_time_epoch = (
-                    QDateTime.currentDateTime().toMSecsSinceEpoch()
-                )
-                time_remaining_ms = timer_time_epoch - current_time_epoch
-                return time_remaining_ms if time_remaining_ms >= 0 else float(
-                    'inf'
-                )  # Expired timers go to the end
-            else:
-                return float('inf')  # No timer goes to the end
-        elif criteria == "ID":
-            return note.id
-        elif criteria == "Text":
-            return note.text
-        elif criteria == "Timer":
-            return note.timer_enabled
-        else:
-            return 0  # Default case
-
-    def get_priority_color(self, priority):
-        if priority == "Critical":
-            return "#C5172E"
-        elif priority == "High":
-            return "#85193C"
-        elif priority == "Medium":
-            return "#E85C0D"
-        else:
-            return "#FCF259"
-
-    def create_action_buttons(self, note_window):
-        widget = QWidget()
-        layout = QHBoxLayout()
-        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        widget.setLayout(layout)
-
-        stick_button = QPushButton()
-        self.update_stick_button_text(stick_button, note_window)
-        stick_button.setStyleSheet(
-            "background-color: lightblue; border-radius: 5px; padding: 5px;"
-            "border: 1px solid #62622f; color: black;"
-            "font-weight: bold; font-size: 12px; min-width: 60px;"
-        )
-        stick_button.setCursor(Qt.CursorShape.PointingHandCursor)
-        stick_button.clicked.connect(
-            lambda: self.toggle_note(note_window, stick_button)
+    @metrics.timed("dashboard.search")
+    def search(self, query):
+        previous = self.query.lower().split()
+        self.query = query
+        if not query.strip():
+            self.model.snippets = {}
+            self.model.set_matches(None)
+            return
+        results = search_notes(query, limit=PAGE_SIZE)
+        self.model.snippets = {result.id: result.snippet for result in results}
+        terms = query.split()
+        self.model.search_terms = terms
+        # Every term is matched as a prefix, so when each earlier term is
+        # still the start of its term the matches can only have narrowed
+        narrow = len(terms) >= len(previous) and all(
+            term.lower().startswith(earlier)
+            for earlier, term in zip(previous, terms)
         )
-        layout.addWidget(stick_button)
+        self.model.set_matches(search_matches(query), narrow=narrow)
 
-        return widget
+    def toggle_note(self, index):
+        # Creates the note window on demand when a note is stuck again.
+        note = self.model.note_at(index.row())
+        self.note_manager.set_stuck(note, note.stuck is False)
 
-    def update_stick_button_text(self, stick_button, note_window):
-        if note_window.isVisible():
-            stick_button.setText("Unstick")
-        else:
-            stick_button.setText("Stick")
+    def show_details(self, index):
+        if index.column() == ACTIONS_COLUMN:
+            return  # Handled by the Stick/Unstick button
+        note_id = int(index.siblingAtColumn(ID_COLUMN).data())
+        note = self.model.note_for_id(note_id)
+        if note is None:
+            return
 
-    def toggle_note(self, note_window, stick_button):
-        if note_window.isVisible():
-            note_window.hide()
-        else:
-            note_window.setWindowFlag(Qt.WindowStaysOnTopHint, True)
-            note_window.show()
-        self.update_stick_button_text(stick_button, note_window)
-
-    def show_details(self, row, column):
-        note_id = int(self.table.item(row, 1).text())
-        note_window = next(
-            (
-                note_window
-                for note_window_id, note_window in (
-                    self.active_notewindows.items()
-                )
-                if note_window.note.id == note_id
-            ),
-            None,
-        )
+        details_dialog = QDialog(self)
+        details_dialog.setWindowTitle(f"Note Details - ID: {note_id}")
+        details_layout = QVBoxLayout()
 
-        if note_window:
-            details_dialog = QDialog(self)
-            details_dialog.setWindowTitle(f"Note Details - ID: {note_id}")
-            details_layout = QVBoxLayout()
+        text_edit = QTextEdit()
+        text_edit.setText(note.text)
+        text_edit.setReadOnly(True)
+        details_layout.addWidget(text_edit)
 
-            text_edit = QTextEdit()
-            text_edit.setText(note_window.note.text)
-            text_edit.setReadOnly(True)
-            details_layout.addWidget(text_edit)
+        priority_label = QLabel(
+            f"Priority: {note.priority}"
+        )
+        details_layout.addWidget(priority_label)
 
-            priority_label = QLabel(
-                f"Priority: {note_window.note.priority}"
-            )
-            details_layout.addWidget(priority_label)
+        timer_enabled = bool(note.timer_enabled)
+        timer_label = QLabel(
+            f"Timer Enabled: {'Yes' if timer_enabled else 'No'}"
+        )
+        details_layout.addWidget(timer_label)
 
-            timer_enabled = bool(note_window.note.timer_enabled)
-            timer_label = QLabel(
-                f"Timer Enabled: {'Yes' if timer_enabled else 'No'}"
+        if note.timer_enabled:
+            timer_time = QDateTime.fromSecsSinceEpoch(
+                note.timer_time
+            )
+            timer_time_label = QLabel(
+                f"Timer Time: {timer_time.toString()}"
             )
-            details_layout.addWidget(timer_label)
+            details_layout.addWidget(timer_time_label)
 
-            if note_window.note.timer_enabled:
-                timer_time = QDateTime.fromSecsSinceEpoch(
-                    note_window.note.timer_time
+        # Earlier versions of the text, newest first; selecting one shows it
+        # in place of the current text
+        versions = history.versions(session.connection(), note_id)
+        if versions:
+            details_layout.addWidget(QLabel("History"))
+            version_list = QListWidget()
+            version_list.addItem("Current text")
+            for version in versions:
+                edited = QDateTime.fromSecsSinceEpoch(version.updated_at)
+                version_list.addItem(
+                    f"{edited.toString('yyyy-MM-dd hh:mm')}  "
+                    f"({version.length} characters)"
                 )
-                timer_time_label = QLabel(
-                    f"Timer Time: {timer_time.toString()}"
+            version_list.setMaximumHeight(120)
+            details_layout.addWidget(version_list)
+            restore_button = QPushButton("Restore this version")
+            restore_button.setEnabled(False)
+            details_layout.addWidget(restore_button)
+
+            def show_version(row):
+                if row <= 0:
+                    text_edit.setText(note.text)
+                    restore_button.setEnabled(False)
+                    return
+                version_text = history.text_at(
+                    session.connection(), note_id, versions[row - 1].version
                 )
-                details_layout.addWidget(timer_time_label)
+                text_edit.setPlainText(version_text)
+                restore_button.setEnabled(version_text != (note.text or ""))
+
+            def restore():
+                self.note_manager.set_text(note, text_edit.toPlainText())
+                details_dialog.accept()
+
+            version_list.currentRowChanged.connect(show_version)
+            restore_button.clicked.connect(restore)
 
-            details_dialog.setLayout(details_layout)
-            details_dialog.exec_()
+        details_dialog.setLayout(details_layout)
+        details_dialog.exec()
 
+    def visible_rows(self):
+        row_count = self.model.rowCount()
+        if row_count == 0:
+            return range(0)
+        first = self.table.rowAt(0)
+        last = self.table.rowAt(self.table.viewport().height() - 1)
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = row_count - 1
+        return range(first, last + 1)
+
+    @metrics.timed("dashboard.time_remaining")
     def update_time_remaining(self):
-        for row in range(self.table.rowCount()):
-            note_id = int(self.table.item(row, 1).text())
-            note_window = next(
-                (
-                    note_window
-                    for note_window_id, note_window in (
-                        self.active_notewindows.items()
-                    )
-                    if note_window.note.id == note_id
-                ),
-                None,
-            )
-            if note_window and note_window.note.timer_enabled:
-                if note_window.note.timer_time is not None:
-                    timer_time_epoch = QDateTime.fromSecsSinceEpoch(
-                        note_window.note.timer_time
-                    ).toMSecsSinceEpoch()
-                    current_time_epoch = (
-                        QDateTime.currentDateTime().toMSecsSinceEpoch()
-                    )
-                    time_remaining_ms = timer_time_epoch - current_time_epoch
-                    if time_remaining_ms >= 0:
-                        days, seconds = divmod(
-                            time_remaining_ms // 1000, 24 * 3600
-                        )
-                        hours, seconds = divmod(seconds, 3600)
-                        minutes, seconds = divmod(seconds, 60)
-                        time_remaining_str = (
-                            f"{int(days)}d {int(hours)}h "
-                            f"{int(minutes)}m {int(seconds)}s"
-                        )
-                    else:
-                        time_remaining_str = "Timer Expired"
-                    item = self.table.item(row, 4)
-                    if item:
-                        item.setText(time_remaining_str)
-                else:
-                    item = self.table.item(row, 4)
-                    if item:
-                        item.setText("N/A")
+        # Only rows on screen with a running timer change every second.
+        for row in self.visible_rows():
+            if self.model.note_at(row).timer_enabled:
+                self.model.refresh_time_remaining(row)
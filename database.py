@@ -1,47 +1,102 @@
 import os
+from collections import namedtuple
+
 from sqlalchemy import (
     Column,
     Integer,
     String,
     Boolean,
     BigInteger,
+    ForeignKey,
+    Index,
     create_engine,
+    event,
+    func,
+    insert,
+    select,
+    text,
 )
-from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import inspect
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+
+from migrations import PREVIEW_LENGTH, migrate
 
 Base = declarative_base()
 
 
 class Note(Base):
     __tablename__ = "notes"
+    __table_args__ = (
+        Index("ix_notes_priority", "priority"),
+        Index("ix_notes_timer", "timer_enabled", "timer_time"),
+        Index("ix_notes_revision", "revision"),
+    )
 
     id = Column(Integer, primary_key=True)
     x = Column(Integer)
     y = Column(Integer)
-    text = Column(String)
     priority = Column(String, default="Low")  # Low, Medium, High, Critical
     timer_enabled = Column(Boolean, default=False)
     timer_time = Column(BigInteger, nullable=True)
+    stuck = Column(Boolean, default=True)  # Shown on screen (vs. unstuck)
+    # The start of the text, which is all the dashboard shows and sorts by
+    preview = Column(String, nullable=True)
+    # Maintained by database triggers for syncing; see migrations.py
+    updated_at = Column(BigInteger, nullable=True)
+    revision = Column(Integer, nullable=True)
+    # The full text is kept apart and only loaded when it is accessed
+    body = relationship(
+        "NoteBody", uselist=False, cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
+    @property
+    def text(self):
+        return self.body.text if self.body is not None else None
 
-# Update the database path
-DATABASE_URL = f"sqlite:///{os.path.join('resources', 'notes.db')}"
+    @text.setter
+    def text(self, value):
+        if self.body is None:
+            self.body = NoteBody(text=value)
+        elif self.body.text != value:
+            self.body.text = value
+        self.preview = make_preview(value)
+
+
+class NoteBody(Base):
+    __tablename__ = "note_bodies"
+
+    id = Column(Integer, ForeignKey("notes.id"), primary_key=True)
+    text = Column(String)
+
+
+def make_preview(note_text):
+    return (note_text or "")[:PREVIEW_LENGTH]
+
+
+# Update the database path (NOTES_DATABASE_URL points elsewhere, e.g. benchmarks)
+DATABASE_URL = os.environ.get(
+    "NOTES_DATABASE_URL", f"sqlite:///{os.path.join('resources', 'notes.db')}"
+)
 
 # Database setup
 engine = create_engine(DATABASE_URL)
 
-# Check if the table exists, if not, create it
-inspector = inspect(engine)
-if not inspector.has_table("notes"):
-    Base.metadata.create_all(engine)
-else:
-    # If the table exists, but doesn't have the 'x' column, recreate the table
-    columns = [column['name'] for column in inspector.get_columns('notes')]
-    if 'x' not in columns or 'y' not in columns:
-        Base.metadata.drop_all(engine)  # Drop the existing table
-        # Create the table with the new schema
-        Base.metadata.create_all(engine)
+
+@event.listens_for(engine, "connect")
+def configure_connection(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+    # commits no longer wait for an fsync of the main database file.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-8000")  # 8 MB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def init_db():
+    """Creates or upgrades the schema; call once before the first query."""
+    return migrate(engine, Base.metadata)
 
 
 # Session setup
@@ -57,4 +112,149 @@ def get_db():
         db.close()
 
 
-session = SessionLocal()
\ No newline at end of file
+session = SessionLocal()
+
+
+SearchResult = namedtuple("SearchResult", ["id", "snippet"])
+
+# bm25 ranking, and the snippets made for it, only cover the newest matches,
+# so a broad prefix such as "a" does not rank every note in the table;
+# search_matches() finds all of them, unranked.
+SEARCH_CANDIDATES = 1000
+SNIPPET_WORDS = 8
+
+SEARCH_SQL = text(
+    "SELECT note_bodies.id, note_bodies.text FROM ("
+    "SELECT rowid, rank FROM notes_fts WHERE notes_fts MATCH :match "
+    "ORDER BY rowid DESC LIMIT :candidates"
+    ") AS hits JOIN note_bodies ON note_bodies.id = hits.rowid "
+    "ORDER BY hits.rank LIMIT :limit"
+)
+
+# Run on the DB-API cursor: a broad prefix matches most notes, and building
+# a result row for each of them costs more than the query itself
+MATCHES_SQL = "SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?"
+
+
+def fts_query(query):
+    # Every word typed so far is matched as a prefix, so results narrow down
+    # while typing; quoting keeps FTS5 operators in the input literal.
+    return " ".join(
+        '"' + term.replace('"', '""') + '"*' for term in query.split()
+    )
+
+
+def make_snippet(note_text, terms, words=SNIPPET_WORDS):
+    """Returns a few words of ``note_text`` around the first matching term."""
+    prefixes = tuple(term.lower() for term in terms)
+    tokens = (note_text or "").split()
+    hits = [token.lower().strip("()[]{}'\".,:;!?").startswith(prefixes)
+            for token in tokens]
+    first = hits.index(True) if True in hits else 0
+    start = max(0, first - words // 2)
+    end = start + words
+    shown = " ".join(
+        f"[{token}]" if hit else token
+        for token, hit in zip(tokens[start:end], hits[start:end])
+    )
+    return ("..." if start else "") + shown + ("..." if end < len(tokens) else "")
+
+
+def search_notes(query, limit=100):
+    """Returns up to ``limit`` SearchResults for ``query``, best match first."""
+    match = fts_query(query)
+    if not match:
+        return []
+    session.flush()  # Include changes the write-behind store has not committed
+    rows = session.execute(
+        SEARCH_SQL,
+        {
+            "match": match,
+            "candidates": max(limit, SEARCH_CANDIDATES),
+            "limit": limit,
+        },
+    )
+    terms = query.split()
+    return [
+        SearchResult(note_id, make_snippet(note_text, terms))
+        for note_id, note_text in rows
+    ]
+
+
+def search_matches(query):
+    """Returns the set of ids of every note matching ``query``."""
+    match = fts_query(query)
+    if not match:
+        return set()
+    session.flush()
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(MATCHES_SQL, (match,))
+        return {note_id for note_id, in cursor}
+    finally:
+        cursor.close()
+
+
+class NoteRecord(
+    namedtuple(
+        "NoteRecord",
+        ["id", "priority", "timer_enabled", "timer_time", "stuck", "preview"],
+    )
+):
+    """
+    The columns needed to list a note, read as a plain tuple instead of a
+    Note tracked by the session.
+    """
+
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return note_text(self.id)
+
+
+def note_records(*criteria):
+    """Returns NoteRecords for the notes matching ``criteria``, by id."""
+    columns = [Note.__table__.c[name] for name in NoteRecord._fields]
+    # Core execution on the session's connection sees changes flushed by the
+    # write-behind store while skipping the ORM's result processing.
+    rows = session.connection().execute(
+        select(*columns).where(*criteria).order_by(Note.id)
+    )
+    return [NoteRecord._make(row) for row in rows]
+
+
+def note_text(note_id):
+    """Returns the full text of a note without loading it as a Note."""
+    return session.connection().execute(
+        select(NoteBody.__table__.c.text).where(NoteBody.__table__.c.id == note_id)
+    ).scalar()
+
+
+def insert_notes(connection, rows):
+    """
+    Inserts notes given as dicts of Note columns plus "text", with one
+    executemany per table, and returns their ids in order.
+    """
+    if not rows:
+        return []
+    # Without AUTOINCREMENT each new row gets the largest id in use plus one,
+    # so one executemany yields consecutive ids. A plain executemany is much
+    # faster than RETURNING in parameter order, which SQLite runs row by row.
+    first = connection.execute(select(func.max(Note.id))).scalar() or 0
+    connection.execute(
+        insert(Note),
+        [
+            dict(
+                {key: value for key, value in row.items() if key != "text"},
+                preview=make_preview(row.get("text")),
+            )
+            for row in rows
+        ],
+    )
+    ids = list(range(first + 1, first + 1 + len(rows)))
+    connection.execute(
+        insert(NoteBody),
+        [{"id": note_id, "text": row.get("text")} for note_id, row in zip(ids, rows)],
+    )
+    return ids
@@ -0,0 +1,83 @@
+from PySide6.QtCore import QObject
+from PySide6.QtGui import QTextCursor
+
+from utils import auto_list_line
+
+
+class AutoListFormatter(QObject):
+    """
+    Applies auto-list formatting incrementally to a QTextDocument.
+
+    Document changes are recorded from ``contentsChange`` and ``apply()``
+    only re-evaluates the blocks they touched, plus the empty blocks right
+    after them that a new list item may fill in. Blocks are edited in place
+    so the document, undo stack and text cursors are kept intact.
+    """
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self._dirty_start = None
+        self._dirty_end = None
+        self._applying = False
+        document.contentsChange.connect(self._contents_changed)
+
+    def _contents_changed(self, position, chars_removed, chars_added):
+        if self._applying:
+            return
+        end = position + chars_added
+        if self._dirty_start is None:
+            self._dirty_start, self._dirty_end = position, end
+            return
+        # Shift the pending range by the size of this change.
+        if self._dirty_end > position:
+            self._dirty_end = max(
+                self._dirty_end + chars_added - chars_removed, end
+            )
+        self._dirty_start = min(self._dirty_start, position)
+        self._dirty_end = max(self._dirty_end, end)
+
+    def apply(self):
+        """
+        Formats the blocks changed since the last call. Returns True if any
+        block was rewritten.
+        """
+        if self._dirty_start is None:
+            return False
+
+        last_position = self.document.characterCount() - 1
+        block = self.document.findBlock(min(self._dirty_start, last_position))
+        last_changed = self.document.findBlock(
+            min(self._dirty_end, last_position)
+        ).blockNumber()
+        self._dirty_start = self._dirty_end = None
+
+        previous = block.previous()
+        previous_text = previous.text() if previous.isValid() else None
+        rewritten = False
+        cursor = QTextCursor(self.document)
+
+        self._applying = True
+        try:
+            while block.isValid():
+                text = block.text()
+                past_change = block.blockNumber() > last_changed
+                if past_change and text:
+                    break  # Non-empty blocks are never rewritten
+                new_text = auto_list_line(text, previous_text)
+                if new_text != text:
+                    if not rewritten:
+                        # Undo the formatting together with the edit.
+                        cursor.joinPreviousEditBlock()
+                        rewritten = True
+                    cursor.setPosition(block.position())
+                    cursor.insertText(new_text)
+                elif past_change:
+                    break  # The empty blocks after this one stay empty too
+                previous_text = new_text
+                block = block.next()
+        finally:
+            if rewritten:
+                cursor.endEditBlock()
+            self._applying = False
+        return rewritten
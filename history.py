@@ -0,0 +1,289 @@
+"""
+Compact revision history of note texts.
+
+Every version of a note's text is a row of note_versions holding either the
+full text (a snapshot, every SNAPSHOT_EVERY versions) or a diff against the
+version before it, so rebuilding any version applies at most
+SNAPSHOT_EVERY - 1 diffs. Saves within BURST_SECONDS of the start of the
+latest version are merged into it, unless they delete most of the text.
+"""
+import json
+import os
+import time
+from difflib import SequenceMatcher
+
+from sqlalchemy import inspect, text
+
+from database import engine
+
+SNAPSHOT_EVERY = 20
+BURST_SECONDS = 30
+
+# History older than KEEP_DAYS keeps only the last version of each day
+KEEP_DAYS = 7
+MAX_VERSIONS = 200  # Per note
+DAY = 86400
+
+LATEST_SQL = text(
+    "SELECT id, version, created_at, snapshot, length FROM note_versions "
+    "WHERE note_id = :note_id ORDER BY version DESC LIMIT 1"
+)
+
+# The nearest snapshot at or before the version, then the diffs after it
+CHAIN_SQL = text(
+    "SELECT snapshot, data FROM note_versions "
+    "WHERE note_id = :note_id AND version <= :version AND version >= ("
+    "SELECT max(version) FROM note_versions "
+    "WHERE note_id = :note_id AND version <= :version AND snapshot) "
+    "ORDER BY version"
+)
+
+INSERT_SQL = text(
+    "INSERT INTO note_versions "
+    "(note_id, version, created_at, updated_at, snapshot, data, length) "
+    "VALUES (:note_id, :version, :created_at, :updated_at, :snapshot, "
+    ":data, :length)"
+)
+
+# Notes with more versions than allowed, or with old days of several versions
+PRUNE_CANDIDATES_SQL = text(
+    "SELECT note_id FROM note_versions GROUP BY note_id "
+    "HAVING count(*) > :max_versions "
+    "OR sum(created_at < :cutoff) > count(DISTINCT CASE "
+    "WHEN created_at < :cutoff THEN created_at / 86400 END)"
+)
+
+
+def make_diff(old, new):
+    """
+    Returns the changes from ``old`` to ``new`` as JSON [start, end, text]
+    replacements of ``old``'s characters, found line by line and trimmed to
+    the characters that differ.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    old_offsets = [0]
+    for line in old_lines:
+        old_offsets.append(old_offsets[-1] + len(line))
+    new_offsets = [0]
+    for line in new_lines:
+        new_offsets.append(new_offsets[-1] + len(line))
+
+    changes = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        start, end = old_offsets[i1], old_offsets[i2]
+        removed = old[start:end]
+        inserted = new[new_offsets[j1]:new_offsets[j2]]
+        prefix = len(os.path.commonprefix([removed, inserted]))
+        suffix = len(os.path.commonprefix(
+            [removed[prefix:][::-1], inserted[prefix:][::-1]]
+        ))
+        changes.append(
+            [start + prefix, end - suffix, inserted[prefix:len(inserted) - suffix]]
+        )
+    return json.dumps(changes, ensure_ascii=False, separators=(",", ":"))
+
+
+def apply_diff(old, diff):
+    parts = []
+    position = 0
+    for start, end, inserted in json.loads(diff):
+        parts.append(old[position:start])
+        parts.append(inserted)
+        position = end
+    parts.append(old[position:])
+    return "".join(parts)
+
+
+class History:
+    """Records, rebuilds and prunes the versions of note texts."""
+
+    def __init__(self):
+        # Note id -> (version, text) of the latest version seen, so typing
+        # does not rebuild the text it is compared against on every save
+        self.texts = {}
+
+    def versions(self, connection, note_id):
+        """Returns (version, created_at, updated_at, length) rows, newest first."""
+        return connection.execute(
+            text(
+                "SELECT version, created_at, updated_at, length "
+                "FROM note_versions WHERE note_id = :note_id "
+                "ORDER BY version DESC"
+            ),
+            {"note_id": note_id},
+        ).all()
+
+    def text_at(self, connection, note_id, version):
+        """Rebuilds the text of a version from the snapshot before it."""
+        cached = self.texts.get(note_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        note_text = None
+        for snapshot, data in connection.execute(
+            CHAIN_SQL, {"note_id": note_id, "version": version}
+        ):
+            note_text = data if snapshot else apply_diff(note_text, data)
+        return note_text
+
+    def unflushed_change(self, note):
+        """
+        Returns (changed, previous_text): whether the text of ``note`` was
+        edited since the session last flushed it, and the text from before.
+        Flushing forgets both, so ask before the session flushes.
+        """
+        if "body" in inspect(note).unloaded or note.body is None:
+            return False, None  # The text cannot have changed without loading it
+        changes = inspect(note.body).attrs.text.history
+        previous = changes.deleted[0] if changes.deleted else None
+        return changes.has_changes(), previous
+
+    def record_notes(self, session, notes, previous_texts):
+        """
+        Records the texts of ``notes`` whose bodies are loaded.
+        ``previous_texts`` maps the notes whose text was edited to their
+        text from before, as unflushed_change() found it.
+        """
+        connection = session.connection()
+        for note in notes:
+            if note.id is None or "body" in inspect(note).unloaded:
+                continue
+            body = note.body
+            if body is None:
+                continue
+            self.record(
+                connection, note.id, body.text, previous_texts.get(note),
+                note in previous_texts,
+            )
+
+    def record(self, connection, note_id, note_text, previous_text=None,
+               changed=True, now=None):
+        """
+        Adds ``note_text`` as the newest version of a note, or merges it into
+        the latest version while a burst of edits lasts. ``previous_text`` is
+        kept as the first version when the note has no history yet.
+        """
+        now = int(time.time()) if now is None else now
+        note_text = note_text or ""
+        latest = connection.execute(LATEST_SQL, {"note_id": note_id}).first()
+        if latest is None:
+            if not changed:
+                return
+            version = 1
+            if previous_text and previous_text != note_text:
+                self._insert(connection, note_id, 1, previous_text, None, now)
+                version = 2
+            self._insert(
+                connection, note_id, version, note_text, previous_text, now
+            )
+            return
+
+        latest_text = self.text_at(connection, note_id, latest.version)
+        if note_text == latest_text:
+            return
+        # A save that deletes most of the text starts a version of its own,
+        # so the text from before it can be restored
+        wipe = len(note_text) < latest.length // 2
+        if now - latest.created_at < BURST_SECONDS and not wipe:
+            self._merge(connection, note_id, latest, note_text, now)
+        else:
+            self._insert(
+                connection, note_id, latest.version + 1, note_text, latest_text, now
+            )
+
+    def _insert(self, connection, note_id, version, note_text, previous_text,
+                created_at, updated_at=None):
+        snapshot = (version - 1) % SNAPSHOT_EVERY == 0
+        connection.execute(
+            INSERT_SQL,
+            {
+                "note_id": note_id,
+                "version": version,
+                "created_at": created_at,
+                "updated_at": created_at if updated_at is None else updated_at,
+                "snapshot": snapshot,
+                "data": note_text if snapshot else make_diff(previous_text, note_text),
+                "length": len(note_text),
+            },
+        )
+        self.texts[note_id] = (version, note_text)
+
+    def _merge(self, connection, note_id, latest, note_text, now):
+        if latest.snapshot:
+            data = note_text
+        else:
+            base = self.text_at(connection, note_id, latest.version - 1)
+            if note_text == base:
+                # The burst was undone
+                connection.execute(
+                    text("DELETE FROM note_versions WHERE id = :id"),
+                    {"id": latest.id},
+                )
+                self.texts[note_id] = (latest.version - 1, base)
+                return
+            data = make_diff(base, note_text)
+        connection.execute(
+            text(
+                "UPDATE note_versions SET data = :data, length = :length, "
+                "updated_at = :now WHERE id = :id"
+            ),
+            {"data": data, "length": len(note_text), "now": now, "id": latest.id},
+        )
+        self.texts[note_id] = (latest.version, note_text)
+
+    def prune(self, connection, now=None):
+        """
+        Thins versions older than KEEP_DAYS to the last one of each day and
+        keeps at most MAX_VERSIONS per note, re-encoding the history of each
+        note pruned. Returns the number of versions removed.
+        """
+        now = int(time.time()) if now is None else now
+        cutoff = now - KEEP_DAYS * DAY
+        note_ids = connection.execute(
+            PRUNE_CANDIDATES_SQL,
+            {"max_versions": MAX_VERSIONS, "cutoff": cutoff},
+        ).scalars().all()
+        removed = 0
+        for note_id in note_ids:
+            versions = []
+            note_text = None
+            for row in connection.execute(
+                text(
+                    "SELECT created_at, updated_at, snapshot, data "
+                    "FROM note_versions WHERE note_id = :note_id ORDER BY version"
+                ),
+                {"note_id": note_id},
+            ):
+                note_text = row.data if row.snapshot else apply_diff(note_text, row.data)
+                versions.append((row.created_at, row.updated_at, note_text))
+            kept = [
+                version for index, version in enumerate(versions)
+                if version[0] >= cutoff
+                or index + 1 == len(versions)
+                or versions[index + 1][0] // DAY != version[0] // DAY
+            ][-MAX_VERSIONS:]
+
+            connection.execute(
+                text("DELETE FROM note_versions WHERE note_id = :note_id"),
+                {"note_id": note_id},
+            )
+            previous_text = None
+            for version, (created_at, updated_at, note_text) in enumerate(kept, 1):
+                self._insert(
+                    connection, note_id, version, note_text, previous_text,
+                    created_at, updated_at,
+                )
+                previous_text = note_text
+            removed += len(versions) - len(kept)
+        return removed
+
+
+history = History()
+
+
+def prune_history():
+    with engine.begin() as connection:
+        return history.prune(connection)
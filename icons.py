@@ -0,0 +1,85 @@
+import math
+
+from PySide6.QtCore import QRectF, Qt
+from PySide6.QtGui import QColor, QIcon, QPainter, QPainterPath, QPixmap
+
+
+class IconCache:
+    """
+    Process-wide store of (optionally tinted) icons.
+
+    Each (resource path, color, size) is rendered once; tinting paints the
+    color over the icon with SourceIn composition, so the icon's alpha
+    channel is kept and no Python pixel loop is needed.
+    """
+
+    def __init__(self):
+        self._icons = {}
+
+    def icon(self, icon_path, color=None, size=(35, 30)):
+        if color is not None and not isinstance(color, QColor):
+            color = QColor(color)
+        key = (icon_path, None if color is None else color.rgba(), size)
+        icon = self._icons.get(key)
+        if icon is None:
+            icon = QIcon(self.pixmap(icon_path, color, size))
+            self._icons[key] = icon
+        return icon
+
+    def pixmap(self, icon_path, color, size):
+        pixmap = QIcon(icon_path).pixmap(*size)
+        if color is None:
+            return pixmap
+        tinted = QPixmap(pixmap.size())
+        tinted.setDevicePixelRatio(pixmap.devicePixelRatio())
+        tinted.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(tinted)
+        painter.drawPixmap(0, 0, pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+        painter.fillRect(tinted.rect(), color)
+        painter.end()
+        return tinted
+
+    def preload(self, icon_paths, colors, size=(35, 30)):
+        for icon_path in icon_paths:
+            for color in colors:
+                self.icon(icon_path, color, size)
+
+
+icon_cache = IconCache()
+
+
+class BackgroundCache:
+    """
+    Process-wide store of rounded note backgrounds.
+
+    A background is rendered, antialiased, once per (size, priority, device
+    pixel ratio) and then only copied to the window when it is painted.
+    """
+
+    MAX_ENTRIES = 64  # Resizing would otherwise keep adding sizes
+    RADIUS = 20
+
+    def __init__(self):
+        self._pixmaps = {}
+
+    def pixmap(self, width, height, theme, ratio):
+        key = (width, height, theme.priority, ratio)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            if len(self._pixmaps) >= self.MAX_ENTRIES:
+                self._pixmaps.clear()
+            pixmap = QPixmap(math.ceil(width * ratio), math.ceil(height * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            path = QPainterPath()
+            path.addRoundedRect(QRectF(0, 0, width, height), self.RADIUS, self.RADIUS)
+            painter.fillPath(path, theme.bg_color)
+            painter.end()
+            self._pixmaps[key] = pixmap
+        return pixmap
+
+
+background_cache = BackgroundCache()
@@ -0,0 +1,201 @@
+"""
+Bulk import of notes from CSV, JSON and Markdown files.
+
+CSV files have a header row naming note columns (the sheet written by sync.py
+can be read back); JSON files hold a list of objects with the same keys;
+Markdown and text files become one note each, or one note per section.
+Imported notes are written unstuck, so no windows are opened for them.
+"""
+import csv
+import json
+import os
+import time
+
+from sqlalchemy import text
+
+from database import engine, insert_notes
+from migrations import transaction
+
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+EXTENSIONS = {".csv", ".json", ".md", ".markdown", ".txt"}
+
+# Rows per executemany
+BATCH_SIZE = 5000
+
+# Triggers that run once for every inserted row; import_notes drops them for
+# the import and does their work once for all rows (see migrations.py)
+INSERT_TRIGGERS = ["notes_change_insert", "note_bodies_change_insert", "notes_fts_insert"]
+
+
+def parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def note_row(values):
+    """Builds an insert_notes() row from a CSV row or JSON object."""
+    values = {
+        key.strip().lower().replace(" ", "_"): value
+        for key, value in values.items() if key is not None
+    }
+    priority = str(values.get("priority") or "Low").strip().capitalize()
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {values['priority']!r}")
+    timer_time = values.get("timer_time")
+    timer_enabled = timer_time not in (None, "") and parse_bool(
+        values.get("timer_enabled", True)
+    )
+    return {
+        "x": int(values.get("x") or 0),
+        "y": int(values.get("y") or 0),
+        "priority": priority,
+        "timer_enabled": timer_enabled,
+        "timer_time": int(timer_time) if timer_enabled else None,
+        "stuck": False,
+        "text": str(values.get("text") or ""),
+    }
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for values in csv.DictReader(f):
+            # Deletions in a sheet written by sync.py
+            if (values.get("Op") or values.get("op")) == "delete":
+                continue
+            yield note_row(values)
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("notes", [data])
+    for values in data:
+        yield note_row(values if isinstance(values, dict) else {"text": values})
+
+
+def markdown_sections(lines):
+    """Splits at the headings of the highest level used outside code blocks."""
+    headings = []
+    fenced = False
+    for number, line in enumerate(lines):
+        if line.startswith(("```", "~~~")):
+            fenced = not fenced
+        elif not fenced and line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            if line[level:level + 1] in (" ", "\n", ""):
+                headings.append((number, level))
+    if not headings:
+        return [lines]
+    top = min(level for _, level in headings)
+    starts = [number for number, level in headings if level == top]
+    return [
+        lines[start:end]
+        for start, end in zip([0] + starts, starts + [len(lines)])
+    ]
+
+
+def read_markdown(path, sections=False):
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    for section in markdown_sections(lines) if sections else [lines]:
+        note_text = "".join(section).strip()
+        if note_text:
+            yield note_row({"text": note_text})
+
+
+def read_notes(path, sections=False):
+    """Yields an insert_notes() row for every note in the file at ``path``."""
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension == ".csv":
+            yield from read_csv(path)
+        elif extension == ".json":
+            yield from read_json(path)
+        else:
+            yield from read_markdown(path, sections)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"{path}: {e}") from e
+
+
+def expand_paths(paths):
+    """Replaces directories in ``paths`` by the importable files inside them."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in EXTENSIONS:
+                    yield os.path.join(directory, name)
+
+
+def import_notes(connection, rows, batch_size=BATCH_SIZE):
+    """
+    Inserts ``rows`` in ``batch_size`` executemany batches on ``connection``,
+    within its transaction, and returns the new ids in order. The triggers
+    are dropped and recreated in that transaction too, so it must be one
+    from migrations.transaction() for a failed import to restore them.
+
+    Revisions, full-text entries and tombstone cleanup, which triggers do
+    row by row, are done once for the whole import.
+    """
+    triggers = connection.execute(
+        text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+            "AND name IN (" + ", ".join(f"'{name}'" for name in INSERT_TRIGGERS) + ")"
+        )
+    ).all()
+    for name, _ in triggers:
+        connection.execute(text(f"DROP TRIGGER {name}"))
+
+    revision = connection.execute(
+        text("SELECT value FROM sync_state WHERE name = 'revision'")
+    ).scalar() or 0
+    now = int(time.time())
+    ids = []
+    batch = []
+    for row in rows:
+        revision += 1
+        batch.append(dict(row, revision=revision, updated_at=now))
+        if len(batch) == batch_size:
+            ids += insert_notes(connection, batch)
+            batch = []
+    ids += insert_notes(connection, batch)
+
+    if ids:
+        # New ids are above every id in use, so they are exactly id >= first
+        first = {"first": ids[0]}
+        connection.execute(
+            text(
+                "INSERT INTO notes_fts(rowid, text) "
+                "SELECT id, text FROM note_bodies WHERE id >= :first"
+            ),
+            first,
+        )
+        connection.execute(
+            text(
+                "DELETE FROM note_tombstones "
+                "WHERE id IN (SELECT id FROM notes WHERE id >= :first)"
+            ),
+            first,
+        )
+        connection.execute(
+            text("UPDATE sync_state SET value = :revision WHERE name = 'revision'"),
+            {"revision": revision},
+        )
+    for _, sql in triggers:
+        connection.exec_driver_sql(sql)
+    return ids
+
+
+def import_files(paths, sections=False, batch_size=BATCH_SIZE):
+    """Imports the notes in ``paths`` in one transaction; returns their ids."""
+    with transaction(engine) as connection:
+        return import_notes(
+            connection,
+            (row for path in expand_paths(paths) for row in read_notes(path, sections)),
+            batch_size,
+        )
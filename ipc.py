@@ -0,0 +1,71 @@
+"""
+Client side of the local command channel to the running instance.
+
+Only the standard library is imported here, so later launches and cli.py can
+hand a command over and exit without loading Qt or SQLAlchemy. A request is
+one JSON line, {"command": ..., "args": [...]}, answered with one JSON line
+holding either "result" or "error".
+"""
+import getpass
+import json
+import os
+import socket
+
+# One instance per user; NOTES_IPC_NAME keeps test runs apart from it
+SERVER_NAME = os.environ.get("NOTES_IPC_NAME", f"warkah-semat-{getpass.getuser()}")
+
+
+# What send_command() raises when no instance is listening. Any other OSError,
+# such as a timeout, means one is but did not answer, maybe because it is
+# still starting: it owns notes.db all the same.
+NOT_RUNNING = (FileNotFoundError, ConnectionRefusedError)
+
+
+class CommandError(Exception):
+    """The running instance rejected a command."""
+
+
+def server_address():
+    """The name to listen on with QLocalServer, and to connect to."""
+    if os.name == "nt":
+        return SERVER_NAME  # A named pipe, \\.\pipe\<name>
+    # An absolute path, so the client does not depend on Qt's temp directory
+    directory = (os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR")
+                 or "/tmp")
+    return os.path.join(directory, SERVER_NAME)
+
+
+def encode(message):
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+def send_command(command, *args, timeout=5.0):
+    """
+    Runs ``command`` in the running instance and returns its result.
+
+    Raises one of NOT_RUNNING if no instance is listening, another OSError
+    if one did not answer within ``timeout`` seconds, and CommandError if
+    the command failed there.
+    """
+    request = encode({"command": command, "args": list(args)})
+    if os.name == "nt":
+        with open(r"\\.\pipe\%s" % server_address(), "r+b", buffering=0) as pipe:
+            pipe.write(request)
+            response = pipe.readline()
+    else:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(server_address())
+            sock.sendall(request)
+            response = b""
+            while not response.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                response += chunk
+    if not response:
+        raise ConnectionError("The running instance closed the connection")
+    reply = json.loads(response)
+    if "error" in reply:
+        raise CommandError(reply["error"])
+    return reply["result"]
@@ -1,35 +1,65 @@
 import os
 import sys
 
-from PySide6.QtGui import QAction, QIcon
-from PySide6.QtWidgets import (
+from ipc import NOT_RUNNING, send_command
+
+# A second launch hands over to the running instance, which owns notes.db,
+# before paying for the Qt and SQLAlchemy imports.
+try:
+    send_command("dashboard")
+except NOT_RUNNING:
+    pass
+except OSError:
+    # An instance is listening but still loading notes; it reads the request
+    # once its event loop runs, and a second instance must not open notes.db
+    print("Sticky Notes is still starting", file=sys.stderr)
+    sys.exit(0)
+else:
+    sys.exit(0)
+
+from PySide6.QtCore import QTimer  # noqa: E402
+from PySide6.QtGui import QAction, QIcon  # noqa: E402
+from PySide6.QtWidgets import (  # noqa: E402
     QApplication,
     QMenu,
     QSystemTrayIcon,
 )
 
-from note_window import NoteWindow
-from database import Note, session  # Import Note and session
-from dashboard import Dashboard  # Import the Dashboard
-from utils import sync_to_google_sheets  # Import the sync function
+from command_server import CommandServer  # noqa: E402
+from database import init_db  # noqa: E402
+from history import prune_history  # noqa: E402
+from note_manager import NoteManager  # noqa: E402
+from persistence import write_behind  # noqa: E402
+from notifications import notification_service  # noqa: E402
+from metrics import metrics  # noqa: E402
+
+# The dashboard and sync modules are imported on first use, keeping them off
+# the path to a visible tray icon.
 
 
 app = QApplication(sys.argv)
 
-# Store references to the NoteWindow objects in this, keyed by id.
-active_notewindows = {}
+# Holds every note; windows are only created for notes stuck on screen.
+note_manager = NoteManager()
+
+# Listen before touching the database; commands wait for the event loop.
+command_server = CommandServer(note_manager)
+if not command_server.listen():
+    # Another instance started at the same time and won
+    try:
+        send_command("dashboard")
+    except OSError:
+        pass  # It shows itself once started
+    sys.exit(0)
 
 
 def create_notewindow():
-    note = NoteWindow(active_notewindows=active_notewindows)
-    note.show()
+    note_manager.create_note()
 
 
 # Load notes from the database on startup
-notes = session.query(Note).all()
-for note in notes:
-    note_window = NoteWindow(note=note, active_notewindows=active_notewindows)
-    note_window.show()
+init_db()
+note_manager.load()
 
 
 # Create the icon
@@ -60,20 +90,82 @@ add_note_action.triggered.connect(create_notewindow)
 menu.addAction(add_note_action)
 
 # Add Dashboard option
+dashboard = None
+
+
+def show_dashboard():
+    global dashboard
+    if dashboard is None:
+        from dashboard import Dashboard
+        dashboard = Dashboard(note_manager)
+    dashboard.show()
+    dashboard.raise_()
+
+
+command_server.register("dashboard", show_dashboard)
+
 dashboard_action = QAction("Dashboard")
-dashboard_action.triggered.connect(lambda: Dashboard(active_notewindows).show())
+dashboard_action.triggered.connect(show_dashboard)
 menu.addAction(dashboard_action)
 
 
 # Add Sync to Google Sheets option
+def sync_notes():
+    from sync import sync_worker
+    # Commit pending edits first so the sync sees every change
+    write_behind.flush()
+    sync_worker.request()
+
+
 sync_action = QAction("Sync to Google Sheets")
-sync_action.triggered.connect(lambda: sync_to_google_sheets(active_notewindows))
+sync_action.triggered.connect(sync_notes)
 menu.addAction(sync_action)
 
+# Sync progress, refreshed whenever the menu opens
+sync_status_action = QAction("Sync: idle")
+sync_status_action.setEnabled(False)
+menu.addAction(sync_status_action)
+
+
+def update_sync_status():
+    from sync import sync_worker
+    sync_status_action.setText(sync_worker.status)
+
+
+def start_sync():
+    from sync import sync_worker
+    sync_worker.start()
+
+
+def stop_sync():
+    from sync import sync_worker
+    sync_worker.stop()
+
+
+menu.aboutToShow.connect(update_sync_status)
+# Deliver anything left in the outbox by a previous run, once the event
+# loop is running
+QTimer.singleShot(0, start_sync)
+# Thin out old note history once the notes are on screen
+QTimer.singleShot(0, prune_history)
+
+
+# Hot-path metrics, collected when NOTES_METRICS names the summary file
+if metrics.enabled:
+    metrics_action = QAction("Dump Metrics")
+    metrics_action.triggered.connect(lambda: metrics.dump())
+    menu.addAction(metrics_action)
+
 
 # Add a Quit option to the menu.
 quit_action = QAction("Quit")
 quit_action.triggered.connect(app.quit)
+# Write any pending note changes before the application exits.
+app.aboutToQuit.connect(write_behind.flush)
+app.aboutToQuit.connect(notification_service.stop)
+app.aboutToQuit.connect(stop_sync)
+if metrics.enabled:
+    app.aboutToQuit.connect(metrics.dump)  # After the final flush
 menu.addAction(quit_action)
 # Add the menu to the tray
 tray.setContextMenu(menu)
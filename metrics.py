@@ -0,0 +1,113 @@
+import functools
+import os
+import statistics
+import threading
+import time
+from collections import Counter, deque
+
+# Set NOTES_METRICS to a file path to collect metrics; the summary goes there
+METRICS_PATH = os.environ.get("NOTES_METRICS", "")
+
+# Most recent samples kept per timer
+MAX_SAMPLES = 10000
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+class Metrics:
+    """
+    Counters and timing histograms for the application's hot paths.
+
+    When disabled, ``timed`` returns the function itself and ``count`` and
+    ``observe`` return at once, so instrumented code costs nothing extra.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.enabled = bool(path)
+        self.started = time.monotonic()
+        self.counts = Counter()
+        self.samples = {}
+        self.sources = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counts[name] += n
+
+    def observe(self, name, milliseconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counts[name] += 1
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=MAX_SAMPLES)
+            samples.append(milliseconds)
+
+    def add_source(self, name, function):
+        """
+        Adds the counters a component keeps itself to the summary, as
+        ``name.key`` for every key of the dict ``function()`` returns.
+        """
+        self.sources[name] = function
+
+    def timed(self, name):
+        """Decorator recording how long every call takes under ``name``."""
+        def decorator(function):
+            if not self.enabled:
+                return function
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        with self._lock:
+            counts = dict(self.counts)
+            samples = {name: list(values) for name, values in self.samples.items()}
+        for source, function in self.sources.items():
+            for key, value in function().items():
+                counts[f"{source}.{key}"] = value
+        lines = [
+            f"Metrics over {elapsed:.1f}s",
+            f"{'name':32}{'count':>9}{'per s':>9}"
+            f"{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+        ]
+        for name in sorted(counts):
+            line = (f"{name:32}{counts[name]:9}"
+                    f"{counts[name] / max(elapsed, 1e-9):9.2f}")
+            values = samples.get(name)
+            if values:
+                line += (f"{percentile(values, 50):10.3f}"
+                         f"{percentile(values, 99):10.3f}"
+                         f"{max(values):10.3f}")
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=None):
+        """Writes the summary to ``path`` (default NOTES_METRICS)."""
+        path = path or self.path
+        if not self.enabled or not path:
+            return
+        try:
+            with open(path, "w") as f:
+                f.write(self.summary())
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
+
+
+metrics = Metrics(METRICS_PATH)
@@ -0,0 +1,370 @@
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+
+
+def add_missing_columns(connection, table, columns):
+    existing = {column['name'] for column in inspect(connection).get_columns(table)}
+    for name, definition in columns:
+        if name not in existing:
+            connection.execute(
+                text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            )
+
+
+def create_notes(connection, metadata):
+    if not inspect(connection).has_table("notes"):
+        metadata.tables["notes"].create(connection)
+    # Older databases lack some columns; add them instead of dropping notes.
+    # New tables lack text as well, which the migrations up to
+    # split_note_bodies still use.
+    add_missing_columns(
+        connection,
+        "notes",
+        [
+            ("x", "INTEGER"),
+            ("y", "INTEGER"),
+            ("text", "VARCHAR"),
+            ("priority", "VARCHAR DEFAULT 'Low'"),
+            ("timer_enabled", "BOOLEAN DEFAULT 0"),
+            ("timer_time", "BIGINT"),
+        ],
+    )
+
+
+def add_stuck_column(connection, metadata):
+    # Notes from before the column existed were all shown at startup
+    add_missing_columns(connection, "notes", [("stuck", "BOOLEAN DEFAULT 1")])
+
+
+def add_sort_indexes(connection, metadata):
+    # Support the dashboard's priority and time remaining orderings
+    connection.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_notes_priority ON notes (priority)")
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_notes_timer "
+            "ON notes (timer_enabled, timer_time)"
+        )
+    )
+
+
+def create_full_text_index(connection, table):
+    # External-content FTS5 index over table.text, kept in sync by triggers.
+    # Prefix indexes keep search-as-you-type queries like "de"* cheap.
+    connection.execute(
+        text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+            f"text, content='{table}', content_rowid='id', prefix='2 3')"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON {table} "
+            "BEGIN "
+            "INSERT INTO notes_fts(rowid, text) VALUES (new.id, new.text); "
+            "END"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON {table} "
+            "BEGIN "
+            "INSERT INTO notes_fts(notes_fts, rowid, text) "
+            "VALUES ('delete', old.id, old.text); "
+            "END"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS notes_fts_update "
+            f"AFTER UPDATE OF text ON {table} "
+            "BEGIN "
+            "INSERT INTO notes_fts(notes_fts, rowid, text) "
+            "VALUES ('delete', old.id, old.text); "
+            "INSERT INTO notes_fts(rowid, text) VALUES (new.id, new.text); "
+            "END"
+        )
+    )
+    connection.execute(text("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')"))
+
+
+def add_full_text_index(connection, metadata):
+    create_full_text_index(connection, "notes")
+
+
+# Columns whose changes need to reach the synced sheet
+SYNCED_COLUMNS = "x, y, text, priority, timer_enabled, timer_time, stuck"
+
+NEXT_REVISION = (
+    "UPDATE sync_state SET value = value + 1 WHERE name = 'revision'; "
+)
+CURRENT_REVISION = "(SELECT value FROM sync_state WHERE name = 'revision')"
+NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def add_change_tracking(connection, metadata):
+    # Every insert, update and delete takes the next value of one revision
+    # counter, so a sync only has to send what changed after the revision
+    # it last reached. Deleted notes leave a tombstone to be synced.
+    add_missing_columns(
+        connection, "notes", [("updated_at", "BIGINT"), ("revision", "INTEGER")]
+    )
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS sync_state "
+            "(name VARCHAR PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS note_tombstones "
+            "(id INTEGER PRIMARY KEY, revision INTEGER NOT NULL, "
+            "deleted_at BIGINT)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_notes_revision ON notes (revision)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_note_tombstones_revision "
+            "ON note_tombstones (revision)"
+        )
+    )
+
+    # Existing notes have never been synced with revisions; send them all once
+    connection.execute(
+        text(f"UPDATE notes SET revision = id, updated_at = {NOW}")
+    )
+    connection.execute(
+        text(
+            "INSERT OR IGNORE INTO sync_state (name, value) "
+            "SELECT 'revision', coalesce(max(revision), 0) FROM notes"
+        )
+    )
+    connection.execute(
+        text("INSERT OR IGNORE INTO sync_state VALUES ('synced_revision', 0)")
+    )
+
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS notes_change_insert "
+            "AFTER INSERT ON notes BEGIN "
+            + NEXT_REVISION
+            + f"UPDATE notes SET revision = {CURRENT_REVISION}, "
+            f"updated_at = {NOW} WHERE id = new.id; "
+            "DELETE FROM note_tombstones WHERE id = new.id; "
+            "END"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS notes_change_update "
+            f"AFTER UPDATE OF {SYNCED_COLUMNS} ON notes BEGIN "
+            + NEXT_REVISION
+            + f"UPDATE notes SET revision = {CURRENT_REVISION}, "
+            f"updated_at = {NOW} WHERE id = new.id; "
+            "END"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS notes_change_delete "
+            "AFTER DELETE ON notes BEGIN "
+            + NEXT_REVISION
+            + "INSERT OR REPLACE INTO note_tombstones (id, revision, deleted_at) "
+            f"VALUES (old.id, {CURRENT_REVISION}, {NOW}); "
+            "END"
+        )
+    )
+
+
+def add_sync_outbox(connection, metadata):
+    # CSV chunks waiting to be delivered, so they survive a restart
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS sync_outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "body TEXT NOT NULL, "
+            "row_count INTEGER NOT NULL, "
+            "revision INTEGER NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at BIGINT)"
+        )
+    )
+
+
+# Characters of the text kept in notes.preview
+PREVIEW_LENGTH = 100
+
+# Gives the note with id new.id the next revision
+TOUCH_NOTE = (
+    NEXT_REVISION
+    + f"UPDATE notes SET revision = {CURRENT_REVISION}, "
+    f"updated_at = {NOW} WHERE id = new.id; "
+)
+
+
+def split_note_bodies(connection, metadata):
+    # The text moves to note_bodies so that loading the notes reads only
+    # their short previews. notes.text stays behind, empty: older SQLite
+    # versions cannot drop columns.
+    add_missing_columns(connection, "notes", [("preview", "VARCHAR")])
+    metadata.tables["note_bodies"].create(connection, checkfirst=True)
+    for trigger in [
+        "notes_fts_insert", "notes_fts_delete", "notes_fts_update",
+        "notes_change_update",
+    ]:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    connection.execute(text("DROP TABLE IF EXISTS notes_fts"))
+
+    connection.execute(
+        text(
+            "INSERT OR IGNORE INTO note_bodies (id, text) "
+            "SELECT id, text FROM notes"
+        )
+    )
+    connection.execute(
+        text(
+            "UPDATE notes SET "
+            "preview = substr(coalesce(text, ''), 1, :length), text = NULL"
+        ),
+        {"length": PREVIEW_LENGTH},
+    )
+    create_full_text_index(connection, "note_bodies")
+
+    # Text changes now arrive through note_bodies
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS notes_change_update "
+            "AFTER UPDATE OF x, y, priority, timer_enabled, timer_time, stuck "
+            "ON notes BEGIN " + TOUCH_NOTE + "END"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS note_bodies_change_insert "
+            "AFTER INSERT ON note_bodies BEGIN " + TOUCH_NOTE + "END"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS note_bodies_change_update "
+            "AFTER UPDATE OF text ON note_bodies BEGIN " + TOUCH_NOTE + "END"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS notes_delete_body "
+            "AFTER DELETE ON notes BEGIN "
+            "DELETE FROM note_bodies WHERE id = old.id; "
+            "END"
+        )
+    )
+
+
+def add_note_history(connection, metadata):
+    # Earlier versions of each note's text, as snapshots and diffs; see
+    # history.py. They go with the note when it is deleted.
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS note_versions ("
+            "id INTEGER PRIMARY KEY, "
+            "note_id INTEGER NOT NULL, "
+            "version INTEGER NOT NULL, "
+            "created_at BIGINT NOT NULL, "
+            "updated_at BIGINT NOT NULL, "
+            "snapshot BOOLEAN NOT NULL, "
+            "data TEXT NOT NULL, "
+            "length INTEGER NOT NULL)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_note_versions_note "
+            "ON note_versions (note_id, version)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS notes_delete_versions "
+            "AFTER DELETE ON notes BEGIN "
+            "DELETE FROM note_versions WHERE note_id = old.id; "
+            "END"
+        )
+    )
+
+
+# Forward migrations in order; the schema version is the number applied.
+# Every migration must also work on a database created from the current
+# models, where the table already has the new columns and indexes.
+MIGRATIONS = [
+    create_notes,
+    add_stuck_column,
+    add_sort_indexes,
+    add_full_text_index,
+    add_change_tracking,
+    add_sync_outbox,
+    split_note_bodies,
+    add_note_history,
+]
+
+
+@contextmanager
+def transaction(engine):
+    """
+    Like engine.begin(), but schema changes are part of the transaction too.
+    pysqlite commits on its own before any statement it does not know to
+    start a transaction for, DDL included, so here it is left in autocommit
+    mode and the transaction is begun and ended explicitly.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("BEGIN")
+        try:
+            yield connection
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
+
+
+def migrate(engine, metadata):
+    """
+    Brings the database up to the latest schema version and returns it. All
+    pending migrations run in one transaction, so a failure leaves the
+    database as it was.
+    """
+    with transaction(engine) as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_version "
+                "(version INTEGER NOT NULL)"
+            )
+        )
+        version = connection.execute(
+            text("SELECT version FROM schema_version")
+        ).scalar()
+        if version is None:
+            version = 0
+            connection.execute(text("INSERT INTO schema_version VALUES (0)"))
+        if version > len(MIGRATIONS):
+            print(
+                f"Database schema version {version} is newer than this "
+                f"application ({len(MIGRATIONS)})."
+            )
+            return version
+
+        for number, migration in enumerate(
+            MIGRATIONS[version:], start=version + 1
+        ):
+            migration(connection, metadata)
+            connection.execute(
+                text("UPDATE schema_version SET version = :version"),
+                {"version": number},
+            )
+            version = number
+    return version
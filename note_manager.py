@@ -0,0 +1,178 @@
+from functools import partial
+
+from PySide6.QtCore import QDateTime, QObject, Signal
+from sqlalchemy.orm import selectinload
+
+from database import Note, NoteRecord, note_records, session
+from metrics import metrics
+from note_window import NoteWindow, preload_icons
+from notifications import notification_service
+from persistence import write_behind
+from scheduler import scheduler
+
+
+class NoteManager(QObject):
+    """
+    Owns every note record and creates note windows only when needed.
+
+    All notes are loaded at startup: those stuck on screen as Notes with
+    their full text, the rest as read-only NoteRecords until one is edited.
+    A NoteWindow is materialized only for notes that are stuck on screen,
+    or later when a note is stuck from the dashboard. Deadlines of notes
+    without a window are scheduled here, so they still alert on expiry.
+    """
+
+    note_added = Signal(object)
+    notes_added = Signal(list)  # Many notes at once, e.g. by an import
+    note_changed = Signal(object)
+    note_removed = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.notes = {}  # note id -> Note
+        self.windows = {}  # note id -> NoteWindow
+        self.deadlines = {}  # note id -> scheduler callback, for windowless notes
+        # Windows keyed by id(window), maintained by NoteWindow itself
+        self.active_notewindows = {}
+
+    @metrics.timed("note_manager.load")
+    def load(self):
+        preload_icons()
+        stuck = Note.stuck.isnot(False)
+        query = session.query(Note).filter(stuck).order_by(Note.id)
+        for note in query.options(selectinload(Note.body)):
+            self.notes[note.id] = note
+        for record in note_records(~stuck):
+            self.notes[record.id] = record
+        for note in self.notes.values():
+            if note.stuck is not False:
+                self.window_for(note)
+        self.schedule_deadlines(
+            note for note in self.notes.values() if note.stuck is False
+        )
+
+    def window_for(self, note):
+        note_window = self.windows.get(note.id)
+        if note_window is None:
+            note_window = NoteWindow(
+                note=note, active_notewindows=self.active_notewindows
+            )
+            self._track(note_window)
+            self.cancel_deadline(note.id)  # The window alerts from now on
+        return note_window
+
+    def create_note(self):
+        note_window = NoteWindow(active_notewindows=self.active_notewindows)
+        note = note_window.note
+        self.notes[note.id] = note
+        self._track(note_window)
+        self.note_added.emit(note)
+        note_window.show()
+        return note_window
+
+    def load_imported(self, ids):
+        """Adds notes written straight to the database, like imports."""
+        if not ids:
+            return
+        records = note_records(Note.id.between(ids[0], ids[-1]))
+        for record in records:
+            self.notes[record.id] = record
+        self.schedule_deadlines(records)
+        self.notes_added.emit(records)
+
+    def editable(self, note):
+        """Returns ``note`` as a Note, loading it in place of a NoteRecord."""
+        if isinstance(note, NoteRecord):
+            note = session.get(Note, note.id)
+            self.notes[note.id] = note
+        return note
+
+    def set_stuck(self, note, stuck):
+        note = self.editable(note)
+        if stuck:
+            self.window_for(note).stick()
+            return
+        note_window = self.windows.get(note.id)
+        if note_window is not None:
+            note_window.unstick()
+        else:
+            note.stuck = False
+            write_behind.mark_dirty(note)
+            self.note_changed.emit(note)
+
+    def set_text(self, note, note_text):
+        """Replaces the text of ``note``, e.g. with an earlier version."""
+        note = self.editable(note)
+        note_window = self.windows.get(note.id)
+        if note_window is not None:
+            note_window.text.setPlainText(note_text)  # Saved like typed text
+            return
+        note.text = note_text
+        write_behind.mark_dirty(note)
+        self.note_changed.emit(note)
+
+    def schedule_deadlines(self, notes):
+        """
+        Alerts when the timers of ``notes``, which have no window, expire.
+        Timers that expired already, e.g. while the app was closed, alert
+        now, all in one notification.
+        """
+        now = QDateTime.currentDateTime().toSecsSinceEpoch()
+        expired = []
+        for note in notes:
+            if note.timer_enabled and note.timer_time and note.timer_time <= now:
+                expired.append(note.id)
+            self.schedule_deadline(note)
+        if expired:
+            self._alert(expired)
+
+    def schedule_deadline(self, note):
+        """Alerts when the timer of ``note``, which has no window, expires."""
+        now = QDateTime.currentDateTime().toSecsSinceEpoch()
+        if note.timer_enabled and note.timer_time and note.timer_time > now:
+            callback = self.deadlines.get(note.id)
+            if callback is None:
+                callback = partial(self._deadline_expired, note.id)
+                self.deadlines[note.id] = callback
+            scheduler.schedule(callback, note.timer_time)
+        else:
+            self.cancel_deadline(note.id)
+
+    def cancel_deadline(self, note_id):
+        callback = self.deadlines.pop(note_id, None)
+        if callback is not None:
+            scheduler.cancel(callback)
+
+    def _deadline_expired(self, note_id):
+        self.deadlines.pop(note_id, None)
+        note = self.notes.get(note_id)
+        if note is None or note_id in self.windows:
+            return
+        self._alert([note_id])
+
+    def _alert(self, note_ids):
+        # Without a window there is nothing to mute, so the sound plays once
+        if len(note_ids) == 1:
+            message = "Your sticky note timer has expired!"
+        else:
+            message = f"{len(note_ids)} of your sticky note timers have expired!"
+        key = note_ids[0] if len(note_ids) == 1 else tuple(note_ids)
+        notification_service.notify("Sticky Note Deadline", message, key=key)
+        notification_service.play_sound(key=key)
+
+    def _track(self, note_window):
+        self.windows[note_window.note.id] = note_window
+        note_window.note_updated.connect(
+            partial(self._note_window_updated, note_window)
+        )
+
+    def _note_window_updated(self, note_window):
+        note = note_window.note
+        if id(note_window) in self.active_notewindows:
+            self.note_changed.emit(note)
+        else:
+            # NoteWindow.delete() unregisters the window before notifying
+            self.notes.pop(note.id, None)
+            self.windows.pop(note.id, None)
+            self.cancel_deadline(note.id)
+            self.note_removed.emit(note)
@@ -1,13 +1,8 @@
 import os
-from PySide6.QtCore import Qt, QDateTime, QTimer, QRectF, Signal
+from PySide6.QtCore import Qt, QDateTime, QTimer, Signal
 from PySide6.QtGui import (
-    QIcon,
-    QPixmap,
     QColor,
     QPainter,
-    QPainterPath,
-    QBrush,
-    QTextCursor,
 )
 from PySide6.QtWidgets import (
     QHBoxLayout,
@@ -22,18 +17,28 @@ from PySide6.QtWidgets import (
     QFrame,
     QToolButton,
 )
-from database import Note, session
-from utils import auto_list
-import platform
+from database import Note
+from icons import background_cache, icon_cache
+from notifications import notification_service
+from persistence import write_behind
+from themes import THEMES, theme_for
+from scheduler import scheduler
+from formatting import AutoListFormatter
+from metrics import metrics
 
-if platform.system() == "Windows":
-    import winsound
-elif platform.system() == "Linux":
-    try:
-        from playsound import playsound
-    except ImportError:
-        print("Please install playsound using: pip install playsound")
-    import notify2
+
+ICON_PATHS = [
+    os.path.join('resources', 'minimize.png'),
+    os.path.join('resources', 'trash.png'),
+    os.path.join('resources', 'sound_on.png'),
+    os.path.join('resources', 'sound_off.png'),
+]
+
+
+def preload_icons():
+    icon_cache.preload(
+        ICON_PATHS, [theme.icon_color for theme in THEMES.values()]
+    )
 
 
 class NoteWindow(QWidget):
@@ -160,13 +165,23 @@ class NoteWindow(QWidget):
         layout.addWidget(self.timer_input)
 
         self.text = QTextEdit()
+        self.auto_list_formatter = AutoListFormatter(self.text.document(), self)
         layout.addWidget(self.text)
 
-        # Set timer countdown
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_countdown)
-        self.timer.start(1000)  # Update every 1 second
+        # The countdown is driven by the shared scheduler, see update_schedule
         self.time_remaining = ""
+        self.theme = None  # Applied by update_styles
+        # The rounded background, shared through background_cache; dropped
+        # on resize and on a change of theme
+        self.background = None
+
+        # Dragging moves the window at most once per display frame, see
+        # drag_frame; the press position and the window position at the press
+        self.drag_start = None
+        self.drag_target = None
+        self.drag_timer = QTimer(self)
+        self.drag_timer.setSingleShot(True)
+        self.drag_timer.timeout.connect(self.drag_frame)
 
         # Create a frame (border)
         self.frame = QFrame()
@@ -234,40 +249,67 @@ class NoteWindow(QWidget):
 
         # If no note is provided, create one.
         if note is None:
-            self.note = Note()
+            self.note = Note(stuck=True)
             self.save()
         else:
             self.note = note
             self.load()
 
         self.update_styles()
+        self.show()
 
+    @metrics.timed("note_window.text_changed")
     def text_changed(self):
         self.text.blockSignals(True)
-        self.text.setText(auto_list(self.text.toPlainText()))
-        self.text.setMinimumHeight(self.text.document().size().height())
-        self.text.adjustSize()
-        cursor = self.text.textCursor()
-        cursor.movePosition(QTextCursor.End)  # Restore cursor position
-        cursor.setPosition(cursor.position())
-        self.text.setTextCursor(cursor)
+        # Only the blocks touched by this edit are re-formatted, in place.
+        self.auto_list_formatter.apply()
+        self.adjust_text_height()
         self.save()
         self.text.blockSignals(False)
 
+    def adjust_text_height(self):
+        # Only after edits: following every document relayout can oscillate
+        # when re-wrapping changes the height back and forth.
+        self.text.setMinimumHeight(self.text.document().size().height())
+        self.text.adjustSize()
+
     def toggle_timer_input(self, state):
         self.timer_input.setVisible(state == Qt.CheckState.Checked)
         self.save()
 
     def mousePressEvent(self, e):
-        self.previous_pos = e.globalPosition()
+        self.drag_start = (e.globalPosition(), self.pos())
+        self.drag_target = self.pos()
+        screen = self.screen()
+        rate = screen.refreshRate() if screen is not None else 0
+        self.drag_timer.setInterval(int(1000 / rate) if rate > 0 else 16)
 
     def mouseMoveEvent(self, e):
-        delta = e.globalPosition() - self.previous_pos
-        self.move(self.x() + delta.x(), self.y() + delta.y())
-        self.previous_pos = e.globalPosition()
+        if self.drag_start is None:
+            return
+        press_position, start = self.drag_start
+        # Relative to the press, so skipped events lose no distance
+        self.drag_target = start + (e.globalPosition() - press_position).toPoint()
+        metrics.count("note_window.drag_event")
+        if not self.drag_timer.isActive():
+            self.drag_frame()
+
+    def drag_frame(self):
+        # Moves to the latest target, then lets a frame pass before the next
+        # move; events arriving meanwhile only update the target.
+        if self.drag_target != self.pos():
+            metrics.count("note_window.drag_move")
+            self.move(self.drag_target)
+            self.drag_timer.start()
 
     def mouseReleaseEvent(self, e):
-        self.save()
+        if self.drag_start is None:
+            return
+        self.drag_timer.stop()
+        if self.drag_target != self.pos():
+            self.move(self.drag_target)
+        self.drag_start = None
+        self.save_position()
 
     def update_countdown(self):
         if self.note.timer_enabled and self.note.timer_time:
@@ -290,33 +332,84 @@ class NoteWindow(QWidget):
             self.time_remaining_label.setText(self.time_remaining)
             self.frame.setVisible(True)
             self.mute_button.setVisible(True)
+            # Setting the text repaints just the label and the background
+            # beneath it, not the whole window
+            metrics.count("note_window.countdown_repaint")
         else:
             self.time_remaining = ""
             self.frame.setVisible(False)
             self.mute_button.setVisible(False)
 
-        self.update()
+    def update_schedule(self):
+        # Only ask the shared scheduler for wakeups this note actually needs:
+        # its deadline, and the display tick while the countdown is on screen
+        # or an expired alarm keeps sounding.
+        timed = self.note.timer_enabled and self.note.timer_time
+        now = QDateTime.currentDateTime().toSecsSinceEpoch()
+        if timed and self.note.timer_time > now:
+            scheduler.schedule(self.deadline_expired, self.note.timer_time)
+        else:
+            scheduler.cancel(self.deadline_expired)
+
+        expired = timed and self.time_remaining == "Expired"
+        if timed and (self.isVisible() or (expired and not self.sound_muted)):
+            scheduler.watch(self.update_countdown)
+        else:
+            scheduler.unwatch(self.update_countdown)
+
+    def deadline_expired(self):
+        self.update_countdown()
+        self.update_schedule()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_countdown()
+        self.update_schedule()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_schedule()
 
+    @metrics.timed("note_window.paint")
     def paintEvent(self, event):
         super().paintEvent(event)
         if self.active_notewindows is not None:
+            ratio = self.devicePixelRatioF()
+            if self.background is None or self.background.devicePixelRatio() != ratio:
+                self.background = background_cache.pixmap(
+                    self.width(), self.height(),
+                    self.theme or theme_for(self.note.priority), ratio,
+                )
+            # The painter is clipped to the region being repainted, so only
+            # that part of the pixmap is copied
             painter = QPainter(self)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-            path = QPainterPath()
-            rect = QRectF(0, 0, self.width(), self.height())
-            path.addRoundedRect(rect, 20, 20)
-            if self.note.priority == "Critical":
-                bg_color = "#C5172E"
-            elif self.note.priority == "High":
-                bg_color = "#85193C"
-            elif self.note.priority == "Medium":
-                bg_color = "#E85C0D"
-            else:
-                bg_color = "#FCF259"
-            painter.fillPath(path, QBrush(QColor(bg_color)))
+            painter.drawPixmap(0, 0, self.background)
+
+    def resizeEvent(self, event):
+        self.background = None
+        super().resizeEvent(event)
 
     def load(self):
+        # Populate the widgets without their signals, so loading a note does
+        # not save it once per field.
+        widgets = (
+            self.text, self.priority_combo, self.timer_checkbox, self.timer_input
+        )
+        for widget in widgets:
+            widget.blockSignals(True)
+        try:
+            self.populate()
+        finally:
+            for widget in widgets:
+                widget.blockSignals(False)
+        self.auto_list_formatter.apply()
+        self.adjust_text_height()
+
+        self.notification_shown = False
+        self.update_countdown()
+        self.update_schedule()
+
+    def populate(self):
         self.move(self.note.x, self.note.y)
 
         # Set the priority combo box
@@ -349,10 +442,9 @@ class NoteWindow(QWidget):
         else:
             self.timer_input.setVisible(False)
 
-        self.notification_shown = False
-        self.update_countdown()
-
+    @metrics.timed("note_window.save")
     def save(self):
+        previous_timer = (self.note.timer_enabled, self.note.timer_time)
         self.note.x = self.x()
         self.note.y = self.y()
         self.note.text = self.text.toPlainText()
@@ -363,155 +455,106 @@ class NoteWindow(QWidget):
         else:
             self.note.timer_time = None
 
-        # Write the data to the database, adding the Note object to the
-        # current session and committing the changes.
-        session.add(self.note)
-        session.commit()
+        # Mark the note dirty; the write-behind store batches the commit.
+        write_behind.mark_dirty(self.note)
+        if (self.note.timer_enabled, self.note.timer_time) != previous_timer:
+            self.update_countdown()
+            self.update_schedule()
         self.update_styles()
         self.note_updated.emit()
 
+    def save_position(self):
+        """Stores the window position if it differs from the saved one."""
+        if (self.note.x, self.note.y) == (self.x(), self.y()):
+            return False
+        self.note.x = self.x()
+        self.note.y = self.y()
+        # Nothing shown elsewhere depends on the position, so unlike save()
+        # this neither restyles nor notifies listeners
+        write_behind.mark_dirty(self.note)
+        return True
+
     def delete(self):
-        session.delete(self.note)
-        session.commit()
+        scheduler.cancel(self.deadline_expired)
+        scheduler.unwatch(self.update_countdown)
+        write_behind.delete(self.note)
         if self.active_notewindows is not None:
             del self.active_notewindows[id(self)]
         self.note_updated.emit()
         self.close()
 
     def unstick(self):
-        self.setWindowFlag(Qt.WindowStaysOnTopHint, False)
         self.hide()
+        self.set_stays_on_top(False)
+        self.note.stuck = False
+        write_behind.mark_dirty(self.note)
+        self.note_updated.emit()
+
+    def stick(self):
+        self.set_stays_on_top(True)
+        self.show()
+        self.note.stuck = True
+        write_behind.mark_dirty(self.note)
+        self.note_updated.emit()
 
     def set_button_icon(self, button: QPushButton, icon_path: str, color: QColor = None):
-        icon = QIcon(icon_path)
-        pixmap = icon.pixmap(35, 30)
-        if color is not None:
-            image = pixmap.toImage()
-            for x in range(image.width()):
-                for y in range(image.height()):
-                    if image.pixelColor(x, y).alpha() > 0:
-                        image.setPixelColor(x, y, color.toRgb())
-            pixmap = QPixmap.fromImage(image)
-        button.setIcon(QIcon(pixmap))
+        # Tinted icons are rendered once per color and shared by all notes.
+        button.setIcon(icon_cache.icon(icon_path, color))
 
     def update_styles(self):
-        if self.note.priority == "Critical":
-            bg_color = "#C5172E"
-            text_color = "#FFFFFF"
-        elif self.note.priority == "High":
-            bg_color = "#85193C"
-            text_color = "#FFFFFF"
-        elif self.note.priority == "Medium":
-            bg_color = "#E85C0D"
-            text_color = "#FFFFFF"
-        else:
-            bg_color = "#FCF259"
-            text_color = "#62622f"
+        # Themes are precompiled; restyling only happens when the priority
+        # actually moved the note to another theme.
+        theme = theme_for(self.note.priority)
+        if theme is self.theme:
+            return
+        metrics.count("note_window.restyle")
+        self.theme = theme
+        self.background = None
+
+        self.setStyleSheet(theme.window_style)
+        self.frame.setStyleSheet(theme.frame_style)
+        self.timer_label.setStyleSheet(theme.timer_label_style)
+        self.line.setStyleSheet(theme.line_style)
+        self.divider.setStyleSheet(theme.divider_style)
 
-        self.setStyleSheet(
-            f"background: rgba(0, 0, 0, 0); color: {text_color};"
-            f"border: 0; border-radius:20px; "
-            f"border-radius:7px; font-size: 16pt; "
-            f"QComboBox {{border: 1px solid gray; border-radius: 3px; "
-            f"padding: 1px 18px 1px 3px; min-width: 6em;}}"
-            f"QComboBox::drop-down {{subcontrol-origin: padding; "
-            f"subcontrol-position: top right; width: 15px; "
-            f"border-left-width: 1px; border-left-color: darkgray; "
-            f"border-left-style: solid; /* just a single line */"
-            f"border-top-right-radius: 3px; /* same radius as the QComboBox */"
-            f"border-bottom-right-radius: 3px;}}"
-            f"QComboBox:on {{ /* shift the text when the popup opens */ "
-            f"padding: 3px 3px 3px 3px; }}"
-            f"QComboBox QAbstractItemView {{selection-background-color: #FFFF99;"
-            f"selection-color: {text_color};}}"
+        self.set_button_icon(
+            self.unstick_btn, os.path.join('resources', 'minimize.png'),
+            theme.icon_color
         )
-        timer_bg_color = bg_color  # Same as note background
-        timer_text_color = text_color
-        self.frame.setStyleSheet(
-            f"border: 1px solid {text_color}; border-radius: 7px; "
-            f"background-color: {timer_bg_color}; margin: 20px;"
+        self.set_button_icon(
+            self.delete_btn, os.path.join('resources', 'trash.png'),
+            theme.icon_color
         )
-
-        self.timer_label.setStyleSheet(
-            f"border: 1px solid {text_color}; border-radius: 7px; "
-            f"padding: 2px; background-color: {timer_bg_color}; "
-            f"color: {timer_text_color}; font-size: 16pt;"
+        self.set_button_icon(
+            self.mute_button, os.path.join('resources', 'sound_on.png'),
+            theme.icon_color
         )
-
-        if self.note.priority in ("Critical", "High", "Medium"):
-            self.set_button_icon(
-                self.unstick_btn, os.path.join('resources', 'minimize.png'),
-                QColor(text_color)
-            )
-            self.set_button_icon(
-                self.delete_btn, os.path.join('resources', 'trash.png'),
-                QColor(text_color)
-            )
-            self.set_button_icon(
-                self.mute_button, os.path.join('resources', 'sound_on.png'),
-                QColor(text_color)
-            )
-            self.line.setStyleSheet(f"background-color: {text_color};")
-            self.divider.setStyleSheet(
-                f"color: {text_color}; font-size: 16pt;"
-            )
-            self.resize(300, 200)
-            self.setWindowFlag(Qt.WindowStaysOnTopHint, True)
-        else:
-            self.set_button_icon(
-                self.unstick_btn, os.path.join('resources', 'minimize.png')
-            )
-            self.set_button_icon(
-                self.delete_btn, os.path.join('resources', 'trash.png')
-            )
-            self.set_button_icon(
-                self.mute_button, os.path.join('resources', 'sound_on.png')
-            )
-            self.line.setStyleSheet(f"background-color: {text_color};")
-            self.divider.setStyleSheet(
-                f"color: {text_color}; font-size: 16pt;"
-            )
-            self.resize(300, 200)
-            self.setWindowFlag(Qt.WindowStaysOnTopHint, False)
-        self.show()
+        self.resize(300, 200)
+        self.set_stays_on_top(theme.stays_on_top)
+
+    def set_stays_on_top(self, stays_on_top):
+        # Changing window flags re-creates (and hides) the native window, so
+        # only do it when the flag really changes.
+        current = bool(self.windowFlags() & Qt.WindowType.WindowStaysOnTopHint)
+        if current == stays_on_top:
+            return
+        visible = self.isVisible()
+        self.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, stays_on_top)
+        if visible:
+            self.show()
 
     def play_notification_sound(self):
         if self.sound_muted:
             return  # Do not play sound if muted
-
-        if platform.system() == "Windows":
-            winsound.PlaySound("SystemExclamation", winsound.SND_ALIAS)
-        elif platform.system() == "Linux":
-            try:
-                playsound(os.path.join('resources', 'notification.mp3'))
-            except NameError:
-                print("Playsound is not installed")
-            except Exception as e:
-                print(f"Error playing sound: {e}")
-        else:
-            print("Platform not supported for sound notifications.")
+        # Played on the notification worker, rate-limited per note
+        notification_service.play_sound(key=self.note.id)
 
     def show_notification(self):
-        if platform.system() == "Linux":
-            try:
-                notify2.init("Sticky Notes")
-                notice = notify2.Notification(
-                    self.notification_title,
-                    "Your sticky note timer has expired!",
-                    "dialog-information",
-                )
-                notice.show()
-            except ImportError as e:
-                print(f"Error: {e}. Please make sure dbus and notify2 are installed.")
-        elif platform.system() == "Windows":
-            # Windows implementation (using a message box)
-            import ctypes
-
-            ctypes.windll.user32.MessageBoxW(
-                0, "Your sticky note timer has expired!", self.notification_title, 1
-            )
-        else:
-            print("Platform not supported for notifications.")
+        notification_service.notify(
+            self.notification_title,
+            "Your sticky note timer has expired!",
+            key=self.note.id,
+        )
 
     def toggle_mute(self):
         self.sound_muted = not self.sound_muted
@@ -525,4 +568,5 @@ class NoteWindow(QWidget):
                 self.mute_button, os.path.join('resources', 'sound_on.png')
             )
             self.mute_button.setToolTip("Mute Sound")
+        self.update_schedule()
         self.play_notification_sound()
\ No newline at end of file
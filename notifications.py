@@ -0,0 +1,177 @@
+import os
+import platform
+import queue
+import threading
+import time
+
+NOTIFICATION_SOUND = os.path.join('resources', 'notification.mp3')
+
+
+class NullBackend:
+    """Discards notifications and sounds, e.g. for tests and benchmarks."""
+
+    def notify(self, title, message):
+        pass
+
+    def play(self, sound_path):
+        pass
+
+
+class Notify2Backend:
+    def __init__(self):
+        import notify2
+
+        # One D-Bus connection for the lifetime of the service
+        notify2.init("Sticky Notes")
+        self._notify2 = notify2
+
+    def notify(self, title, message):
+        notice = self._notify2.Notification(title, message, "dialog-information")
+        notice.show()
+
+
+class MessageBoxBackend:
+    def notify(self, title, message):
+        import ctypes
+
+        ctypes.windll.user32.MessageBoxW(0, message, title, 1)
+
+
+class PlaysoundBackend:
+    def __init__(self):
+        from playsound import playsound
+
+        self._playsound = playsound
+
+    def play(self, sound_path):
+        self._playsound(sound_path)
+
+
+class WinsoundBackend:
+    def play(self, sound_path):
+        import winsound
+
+        winsound.PlaySound("SystemExclamation", winsound.SND_ALIAS)
+
+
+def default_notifier():
+    system = platform.system()
+    if system == "Linux":
+        try:
+            return Notify2Backend()
+        except Exception as e:
+            print(f"Error: {e}. Please make sure dbus and notify2 are installed.")
+            return NullBackend()
+    elif system == "Windows":
+        return MessageBoxBackend()
+    print("Platform not supported for notifications.")
+    return NullBackend()
+
+
+def default_sound():
+    system = platform.system()
+    if system == "Windows":
+        return WinsoundBackend()
+    elif system == "Linux":
+        try:
+            return PlaysoundBackend()
+        except ImportError:
+            print("Please install playsound using: pip install playsound")
+            return NullBackend()
+    print("Platform not supported for sound notifications.")
+    return NullBackend()
+
+
+class NotificationService:
+    """
+    Shows desktop notifications and plays alert sounds off the GUI thread.
+
+    Requests are queued to a single worker thread that owns the backends.
+    A request with the same key as one still queued is dropped, and sounds
+    for the same key are rate-limited to one per ``sound_interval`` seconds.
+    """
+
+    def __init__(self, notifier=None, sound=None, sound_interval=5.0):
+        self.notifier = notifier
+        self.sound = sound
+        self.sound_interval = sound_interval
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._last_sound = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # Counters
+        self.dispatched = 0
+        self.dropped = 0
+
+    def set_backends(self, notifier=None, sound=None):
+        self.notifier = notifier
+        self.sound = sound
+
+    def notify(self, title, message, key=None):
+        return self._submit(("notify", key), self._notify, title, message)
+
+    def play_sound(self, key=None, sound_path=NOTIFICATION_SOUND):
+        now = time.monotonic()
+        last = self._last_sound.get(key)
+        if last is not None and now - last < self.sound_interval:
+            self.dropped += 1
+            return False
+        self._last_sound[key] = now
+        return self._submit(("sound", key), self._play, sound_path)
+
+    def stop(self, timeout=1.0):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def wait(self):
+        """Blocks until every queued request has been handled."""
+        self._queue.join()
+
+    def _submit(self, job_key, function, *args):
+        with self._lock:
+            if job_key in self._pending:
+                self.dropped += 1
+                return False
+            self._pending.add(job_key)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="notifications", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((job_key, function, args))
+        return True
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            job_key, function, args = job
+            try:
+                function(*args)
+            except Exception as e:
+                print(f"Error dispatching {job_key[0]}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(job_key)
+                self.dispatched += 1
+                self._queue.task_done()
+
+    def _notify(self, title, message):
+        if self.notifier is None:
+            self.notifier = default_notifier()
+        self.notifier.notify(title, message)
+
+    def _play(self, sound_path):
+        if self.sound is None:
+            self.sound = default_sound()
+        self.sound.play(sound_path)
+
+
+notification_service = NotificationService()
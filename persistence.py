@@ -0,0 +1,120 @@
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from database import session
+from history import history
+from metrics import metrics
+
+
+class WriteBehind(QObject):
+    """
+    Coalesces note saves into batched commits.
+
+    Notes are marked dirty on every save and written together in one
+    transaction once no new change arrived for ``debounce_ms``, or at the
+    latest ``max_latency_ms`` after the first pending change.
+    """
+
+    flushed = Signal(int)  # Number of notes written by the commit
+
+    def __init__(self, db_session, debounce_ms=500, max_latency_ms=2000, parent=None):
+        super().__init__(parent)
+        self.session = db_session
+        self.debounce_ms = debounce_ms
+        self.max_latency_ms = max_latency_ms
+
+        self._dirty = set()
+        self._deleted = set()
+        # Edited notes -> their text before the edits, for the history
+        self._previous_texts = {}
+        self._first_dirty_at = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+        # Counters
+        self.saves_requested = 0
+        self.commits = 0
+
+    @property
+    def commits_avoided(self):
+        return self.saves_requested - self.commits
+
+    def stats(self):
+        return {
+            "saves_requested": self.saves_requested,
+            "commits": self.commits,
+            "commits_avoided": self.commits_avoided,
+            "pending": len(self._dirty) + len(self._deleted),
+        }
+
+    def mark_dirty(self, note):
+        self.saves_requested += 1
+        if note not in self._previous_texts:
+            # Any flush, by this store or a search, forgets the old text
+            changed, previous = history.unflushed_change(note)
+            if changed:
+                self._previous_texts[note] = previous
+        if note not in self._dirty:
+            self._dirty.add(note)
+            self.session.add(note)
+        if note.id is None:
+            # New notes need their primary key right away; flushing only
+            # assigns it inside the open transaction, no commit happens.
+            self.session.flush()
+        self._schedule()
+
+    def delete(self, note):
+        # Deletes are written immediately together with any pending saves.
+        self.saves_requested += 1
+        self._dirty.discard(note)
+        self._previous_texts.pop(note, None)
+        if note.id is not None:
+            self.session.delete(note)
+            self._deleted.add(note)
+        elif note in self.session:
+            self.session.expunge(note)
+        self.flush()
+
+    def _schedule(self):
+        now = time.monotonic()
+        if self._first_dirty_at is None:
+            self._first_dirty_at = now
+        elapsed_ms = (now - self._first_dirty_at) * 1000
+        remaining_ms = max(0, self.max_latency_ms - elapsed_ms)
+        self._timer.start(int(min(self.debounce_ms, remaining_ms)))
+
+    def flush(self):
+        self._timer.stop()
+        self._first_dirty_at = None
+        if not self._dirty and not self._deleted:
+            return
+
+        written = len(self._dirty) + len(self._deleted)
+        notes = list(self._dirty)
+        previous_texts = self._previous_texts
+        self._dirty.clear()
+        self._deleted.clear()
+        self._previous_texts = {}
+        try:
+            self._commit(notes, previous_texts)
+        except Exception as e:
+            self.session.rollback()
+            history.texts.clear()  # May hold versions that were rolled back
+            print(f"Error saving notes: {e}")
+            return
+        self.commits += 1
+        metrics.count("write_behind.notes_written", written)
+        self.flushed.emit(written)
+
+    @metrics.timed("write_behind.commit")
+    def _commit(self, notes, previous_texts):
+        # New versions of edited texts are written in the same transaction
+        history.record_notes(self.session, notes, previous_texts)
+        self.session.commit()
+
+
+write_behind = WriteBehind(session)
+metrics.add_source("write_behind", write_behind.stats)
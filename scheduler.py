@@ -0,0 +1,113 @@
+import heapq
+import itertools
+
+from PySide6.QtCore import QObject, QTimer, QDateTime, Qt
+
+from metrics import metrics
+
+
+class DeadlineScheduler(QObject):
+    """
+    Application-wide timer for note deadlines and countdowns.
+
+    Deadlines live in a min-heap and a single precise timer is armed for the
+    earliest one. Countdowns on screen share one display tick that only runs
+    while at least one callback is watching it.
+    """
+
+    # QTimer intervals are 32-bit, so far deadlines are re-armed in steps.
+    MAX_WAIT_MS = 3600 * 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._heap = []
+        self._deadlines = {}  # callback -> deadline (seconds since epoch)
+        self._sequence = itertools.count()
+        self._watchers = set()
+
+        self._deadline_timer = QTimer(self)
+        self._deadline_timer.setSingleShot(True)
+        self._deadline_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._deadline_timer.timeout.connect(self._fire_deadlines)
+
+        self._tick_timer = QTimer(self)
+        self._tick_timer.setInterval(1000)  # Update every 1 second
+        self._tick_timer.timeout.connect(self._tick)
+
+        # Number of times either timer woke the event loop
+        self.wakeups = 0
+
+    def schedule(self, callback, deadline):
+        """Calls ``callback()`` once ``deadline`` (epoch seconds) is reached."""
+        if self._deadlines.get(callback) == deadline:
+            return
+        self._deadlines[callback] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), callback))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+        self._arm()
+
+    def cancel(self, callback):
+        if self._deadlines.pop(callback, None) is not None:
+            self._arm()
+
+    def watch(self, callback):
+        """Calls ``callback()`` on every display tick until unwatched."""
+        self._watchers.add(callback)
+        if not self._tick_timer.isActive():
+            self._tick_timer.start()
+
+    def unwatch(self, callback):
+        self._watchers.discard(callback)
+        if not self._watchers:
+            self._tick_timer.stop()
+
+    def clear(self):
+        self._heap.clear()
+        self._deadlines.clear()
+        self._watchers.clear()
+        self._deadline_timer.stop()
+        self._tick_timer.stop()
+
+    def _compact(self):
+        # Drop entries left behind by rescheduled or cancelled deadlines.
+        self._heap = [
+            entry for entry in self._heap
+            if self._deadlines.get(entry[2]) == entry[0]
+        ]
+        heapq.heapify(self._heap)
+
+    def _arm(self):
+        while self._heap:
+            deadline, _, callback = self._heap[0]
+            if self._deadlines.get(callback) == deadline:
+                break
+            heapq.heappop(self._heap)  # Stale entry
+        if not self._heap:
+            self._deadline_timer.stop()
+            return
+        wait_ms = self._heap[0][0] * 1000 - QDateTime.currentMSecsSinceEpoch()
+        self._deadline_timer.start(int(max(0, min(wait_ms, self.MAX_WAIT_MS))))
+
+    @metrics.timed("scheduler.deadlines")
+    def _fire_deadlines(self):
+        self.wakeups += 1
+        now_ms = QDateTime.currentMSecsSinceEpoch()
+        due = []
+        while self._heap and self._heap[0][0] * 1000 <= now_ms:
+            deadline, _, callback = heapq.heappop(self._heap)
+            if self._deadlines.get(callback) == deadline:
+                del self._deadlines[callback]
+                due.append(callback)
+        self._arm()
+        for callback in due:
+            callback()
+
+    @metrics.timed("scheduler.tick")
+    def _tick(self):
+        self.wakeups += 1
+        for callback in list(self._watchers):
+            callback()
+
+
+scheduler = DeadlineScheduler()
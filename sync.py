@@ -0,0 +1,278 @@
+import csv
+import io
+import os
+import threading
+import time
+import urllib.request
+
+from sqlalchemy import text
+
+from database import engine
+from metrics import metrics
+
+# Set to your Google Apps Script Web App URL, or use GOOGLE_SCRIPT_URL
+GOOGLE_SCRIPT_URL = os.environ.get("GOOGLE_SCRIPT_URL", "")
+
+# Rows per POST request
+CHUNK_SIZE = 500
+
+HEADER = [
+    "Op",
+    "ID",
+    "X",
+    "Y",
+    "Text",
+    "Priority",
+    "Timer Enabled",
+    "Timer Time",
+    "Stuck",
+    "Updated At",
+    "Revision",
+]
+
+# Notes changed and notes deleted within a revision range, oldest first
+CHANGES_SQL = text(
+    "SELECT 'upsert', notes.id, x, y, note_bodies.text, priority, "
+    "timer_enabled, timer_time, stuck, updated_at, revision FROM notes "
+    "LEFT JOIN note_bodies ON note_bodies.id = notes.id "
+    "WHERE revision > :since AND revision <= :until "
+    "UNION ALL "
+    "SELECT 'delete', id, NULL, NULL, NULL, NULL, NULL, NULL, NULL, "
+    "deleted_at, revision FROM note_tombstones "
+    "WHERE revision > :since AND revision <= :until "
+    "ORDER BY revision"
+)
+
+
+def read_state(connection, name):
+    return connection.execute(
+        text("SELECT value FROM sync_state WHERE name = :name"), {"name": name}
+    ).scalar() or 0
+
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def iter_change_chunks(connection, since, until, chunk_size=CHUNK_SIZE):
+    """
+    Yields (csv_text, row_count, last_revision) for the changes after
+    ``since`` up to ``until``, reading ``chunk_size`` rows at a time.
+    """
+    result = connection.execute(CHANGES_SQL, {"since": since, "until": until})
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield encode_csv(rows), len(rows), rows[-1].revision
+
+
+def post_csv(url, body, timeout=30):
+    request = urllib.request.Request(
+        url,
+        data=body.encode("utf-8"),
+        headers={"Content-Type": "text/csv; charset=utf-8"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+
+
+@metrics.timed("sync.capture")
+def capture_changes(chunk_size=CHUNK_SIZE):
+    """
+    Moves the changes made since the last capture into the outbox, one row
+    per CSV chunk, and returns the number of notes captured. The outbox rows
+    and the new high-water mark are written in the same transaction.
+    """
+    captured = 0
+    with engine.begin() as connection:
+        since = read_state(connection, "synced_revision")
+        until = read_state(connection, "revision")
+        for body, count, revision in iter_change_chunks(
+            connection, since, until, chunk_size
+        ):
+            connection.execute(
+                text(
+                    "INSERT INTO sync_outbox "
+                    "(body, row_count, revision, created_at) "
+                    "VALUES (:body, :count, :revision, "
+                    "CAST(strftime('%s', 'now') AS INTEGER))"
+                ),
+                {"body": body, "count": count, "revision": revision},
+            )
+            captured += count
+        connection.execute(
+            text(
+                "UPDATE sync_state SET value = :value "
+                "WHERE name = 'synced_revision'"
+            ),
+            {"value": until},
+        )
+    return captured
+
+
+def pending_rows():
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT coalesce(sum(row_count), 0) FROM sync_outbox")
+        ).scalar()
+
+
+@metrics.timed("sync.deliver")
+def deliver_next(url):
+    """
+    Posts the oldest outbox chunk and removes it once the endpoint accepted
+    it. Returns the number of rows delivered, or None if the outbox is empty.
+    """
+    with engine.connect() as connection:
+        chunk = connection.execute(
+            text("SELECT id, body, row_count FROM sync_outbox ORDER BY id LIMIT 1")
+        ).first()
+    if chunk is None:
+        return None
+    try:
+        post_csv(url, chunk.body)
+    except Exception:
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "UPDATE sync_outbox SET attempts = attempts + 1 "
+                    "WHERE id = :id"
+                ),
+                {"id": chunk.id},
+            )
+        raise
+    with engine.begin() as connection:
+        connection.execute(
+            text("DELETE FROM sync_outbox WHERE id = :id"), {"id": chunk.id}
+        )
+    return chunk.row_count
+
+
+def sync_to_google_sheets(url=None, chunk_size=CHUNK_SIZE):
+    """
+    Captures the notes changed or deleted since the last sync and delivers
+    the outbox in the calling thread. Returns the number of rows sent.
+    """
+    url = url or GOOGLE_SCRIPT_URL
+    if not url:
+        print("Set GOOGLE_SCRIPT_URL to your Apps Script Web App URL to sync.")
+        return 0
+
+    sent = 0
+    try:
+        capture_changes(chunk_size)
+        while (count := deliver_next(url)) is not None:
+            sent += count
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    return sent
+
+
+class SyncWorker:
+    """
+    Syncs notes to Google Sheets from a worker thread.
+
+    ``request()`` only wakes the worker, which captures the pending changes
+    into the outbox and delivers it chunk by chunk. A failed delivery is
+    retried after ``base_delay`` seconds, doubling up to ``max_delay``;
+    requests made in the meantime are batched into that retry.
+    """
+
+    def __init__(self, url=None, base_delay=2.0, max_delay=300.0,
+                 chunk_size=CHUNK_SIZE):
+        self.url = url or GOOGLE_SCRIPT_URL
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.chunk_size = chunk_size
+        self.status = "Sync: idle"
+        self._wake = threading.Event()
+        self._stopping = False
+        self._requested = False
+        self._thread = None
+
+        # Counters
+        self.delivered = 0
+        self.failures = 0
+
+    def start(self):
+        """Starts the worker, which first delivers anything left in the outbox."""
+        if self._thread is not None or not self.url:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="sync", daemon=True
+        )
+        self._thread.start()
+
+    def request(self):
+        if not self.url:
+            print("Set GOOGLE_SCRIPT_URL to your Apps Script Web App URL to sync.")
+            return False
+        self._requested = True
+        self.start()
+        self._wake.set()
+        return True
+
+    def stop(self, timeout=1.0):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        failures = 0
+        while not self._stopping:
+            try:
+                if self._requested:
+                    self._requested = False
+                    self.status = "Sync: preparing changes"
+                    try:
+                        capture_changes(self.chunk_size)
+                    except Exception:
+                        self._requested = True  # Capture again on retry
+                        raise
+                self._deliver()
+            except Exception as e:
+                failures += 1
+                self.failures += 1
+                delay = min(self.base_delay * 2 ** (failures - 1), self.max_delay)
+                self.status = f"Sync failed, retrying in {delay:.0f}s: {e}"
+                print(f"Error syncing notes: {e}")
+                self._sleep(delay)
+            else:
+                failures = 0
+                self.status = f"Sync: up to date ({time.strftime('%H:%M')})"
+                self._wake.wait()
+                self._wake.clear()
+
+    def _sleep(self, delay):
+        # Requests arriving while backing off wait for the retry
+        deadline = time.monotonic() + delay
+        while not self._stopping:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._wake.wait(remaining)
+            self._wake.clear()
+
+    def _deliver(self):
+        while not self._stopping:
+            pending = pending_rows()
+            if not pending:
+                return
+            self.status = f"Sync: sending ({pending} notes pending)"
+            count = deliver_next(self.url)
+            if count is None:
+                return
+            self.delivered += count
+
+
+sync_worker = SyncWorker()
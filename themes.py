@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+from PySide6.QtGui import QColor
+
+
+Theme = namedtuple(
+    "Theme",
+    [
+        "priority",
+        "bg_color",
+        "text_color",
+        "icon_color",  # None keeps the icon's own colors
+        "stays_on_top",
+        "window_style",
+        "frame_style",
+        "timer_label_style",
+        "line_style",
+        "divider_style",
+    ],
+)
+
+
+def compile_theme(priority, bg_color, text_color, tint_icons, stays_on_top):
+    return Theme(
+        priority=priority,
+        bg_color=QColor(bg_color),
+        text_color=QColor(text_color),
+        icon_color=QColor(text_color) if tint_icons else None,
+        stays_on_top=stays_on_top,
+        window_style=(
+            f"background: rgba(0, 0, 0, 0); color: {text_color};"
+            f"border: 0; border-radius:20px; "
+            f"border-radius:7px; font-size: 16pt; "
+            f"QComboBox {{border: 1px solid gray; border-radius: 3px; "
+            f"padding: 1px 18px 1px 3px; min-width: 6em;}}"
+            f"QComboBox::drop-down {{subcontrol-origin: padding; "
+            f"subcontrol-position: top right; width: 15px; "
+            f"border-left-width: 1px; border-left-color: darkgray; "
+            f"border-left-style: solid; /* just a single line */"
+            f"border-top-right-radius: 3px; /* same radius as the QComboBox */"
+            f"border-bottom-right-radius: 3px;}}"
+            f"QComboBox:on {{ /* shift the text when the popup opens */ "
+            f"padding: 3px 3px 3px 3px; }}"
+            f"QComboBox QAbstractItemView {{selection-background-color: #FFFF99;"
+            f"selection-color: {text_color};}}"
+        ),
+        frame_style=(
+            f"border: 1px solid {text_color}; border-radius: 7px; "
+            f"background-color: {bg_color}; margin: 20px;"
+        ),
+        timer_label_style=(
+            f"border: 1px solid {text_color}; border-radius: 7px; "
+            f"padding: 2px; background-color: {bg_color}; "
+            f"color: {text_color}; font-size: 16pt;"
+        ),
+        line_style=f"background-color: {text_color};",
+        divider_style=f"color: {text_color}; font-size: 16pt;",
+    )
+
+
+# The four priority themes, compiled once for every note window.
+THEMES = {
+    "Low": compile_theme("Low", "#FCF259", "#62622f", False, False),
+    "Medium": compile_theme("Medium", "#E85C0D", "#FFFFFF", True, True),
+    "High": compile_theme("High", "#85193C", "#FFFFFF", True, True),
+    "Critical": compile_theme("Critical", "#C5172E", "#FFFFFF", True, True),
+}
+
+
+def theme_for(priority):
+    return THEMES.get(priority, THEMES["Low"])
@@ -1,54 +1,3 @@
-import csv
-
-# Replace with your Google Apps Script Web App URL
-GOOGLE_SCRIPT_URL = "https://script.google.com/macros/s/AKfycb........................../exec"
-
-
-def sync_to_google_sheets(active_notewindows):
-    try:
-        data = [
-            [
-                "ID",
-                "X",
-                "Y",
-                "Text",
-                "Priority",
-                "Timer Enabled",
-                "Timer Time",
-            ]
-        ]  # Header row
-        for note_window_id, note_window in active_notewindows.items():
-            note = note_window.note
-            data.append(
-                [
-                    note.id,
-                    note.x,
-                    note.y,
-                    note.text,
-                    note.priority,
-                    note.timer_enabled,
-                    note.timer_time,
-                ]
-            )
-
-        # Write data to CSV format
-        csv_data = "\n".join([",".join(map(str, row)) for row in data])
-
-        # Send the data to the shared link (this will likely not work directly)
-        # Shared links are typically read-only.  You would need an API
-        # that accepts CSV data to update the sheet.  This is a placeholder.
-        # The following line will likely result in an error.
-        # requests.post(SHARED_LINK_URL, data=csv_data)
-
-        print(
-            "Data prepared.  Direct update to shared link is not possible."
-            "  You need an API to accept the CSV data."
-        )
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-
-
 def auto_list(text):
     lines = text.split("\n")
     if len(lines) < 2:
@@ -90,6 +39,37 @@ def auto_list(text):
     return "\n".join(new_lines)
 
 
+def list_item_state(line):
+    """
+    Returns the list state a line leaves for the line after it: ('hyphen', 0),
+    ('number', n) or None, following the same rules as auto_list.
+    """
+    if line.startswith("- "):
+        return ('hyphen', 0)
+    if line and line[0].isdigit() and ". " in line:
+        try:
+            return ('number', int(line.split(". ")[0]))
+        except ValueError:
+            return None
+    return None
+
+
+def auto_list_line(line, previous_line):
+    """
+    Formats a single line given the (already formatted) line before it.
+    Applying this to every line in order gives the same result as auto_list.
+    """
+    if line or previous_line is None:
+        return line  # Only empty lines after a list item are filled in
+    state = list_item_state(previous_line)
+    if state is None:
+        return line
+    item_type, number = state
+    if item_type == 'hyphen':
+        return "- "
+    return f"{number + 1}. "
+
+
 def strikethrough_completed_tasks(text):
     """
     Strikethroughs lines in the text that are considered completed tasks (list items).